@@ -0,0 +1,112 @@
+# benchmarks/bench_embeddings.py
+#
+# Chunks/sec and peak RSS of each embedding backend in tools/embedding_backends.py:
+# the full-precision torch model versus the int8 ONNX model at several batch
+# sizes and thread counts. Every configuration runs in a fresh interpreter so
+# RSS isn't shared between them; model loading is timed separately.
+#
+#   python benchmarks/bench_embeddings.py manual.pdf handbook.pdf
+#   python benchmarks/bench_embeddings.py --chunks 2000 --batch-sizes 16 32 64 --threads 1 2 4
+#
+# Without PDFs the chunks are synthetic ~500-character texts.
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+WORDS = (
+    "the index of each page holds a model of document data that search and query text "
+    "use to find an embedding for every file section report revenue policy contract "
+    "employee customer warranty backup network server invoice schedule meeting result"
+).split()
+
+
+def synthetic_chunks(count, seed=0):
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words = []
+        while sum(len(w) + 1 for w in words) < 500:
+            words.append(rng.choice(WORDS))
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_one(backend, batch_size, threads, corpus):
+    """Worker side: load the backend, embed the corpus, print one JSON line."""
+    from tools.embedding_backends import load_embeddings
+
+    with open(corpus) as f:
+        chunks = json.load(f)
+    if backend == "torch":
+        import torch
+        torch.set_num_threads(threads)
+    start = time.perf_counter()
+    model = load_embeddings(backend, batch_size=batch_size, threads=threads)
+    model.embed_documents(chunks[:8])  # warm-up
+    loaded = time.perf_counter() - start
+    start = time.perf_counter()
+    model.embed_documents(chunks)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"load": loaded, "rate": len(chunks) / elapsed, "rss": peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--chunks", type=int, default=1000, help="synthetic chunks when no PDFs are given")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx-int8"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--threads", type=int, nargs="+", default=[os.cpu_count() or 1])
+    parser.add_argument("--worker", nargs=4, metavar=("BACKEND", "BATCH", "THREADS", "CORPUS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        backend, batch_size, threads, corpus = args.worker
+        run_one(backend, int(batch_size), int(threads), corpus)
+        return
+
+    if args.pdfs:
+        from tools.pdf_index import iter_documents
+        chunks = [doc.page_content for doc in iter_documents(args.pdfs)]
+    else:
+        chunks = synthetic_chunks(args.chunks)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(chunks, f)
+    print(f"{len(chunks)} chunks")
+
+    try:
+        for backend in args.backends:
+            for threads in args.threads:
+                for batch_size in args.batch_sizes:
+                    out = subprocess.run(
+                        [sys.executable, __file__, "--worker", backend, str(batch_size), str(threads), f.name],
+                        cwd=ROOT, capture_output=True, text=True,
+                    )
+                    if out.returncode != 0:
+                        print(f"{backend:<10} failed:\n{out.stderr.strip()[-500:]}")
+                        continue
+                    result = json.loads(out.stdout.strip().splitlines()[-1])
+                    print(
+                        f"{backend:<10} batch {batch_size:<4d} threads {threads:<3d}"
+                        f"{result['rate']:9.1f} chunks/s  load {result['load']:5.1f} s  peak RSS {result['rss']:6.0f} MB"
+                    )
+    finally:
+        os.remove(f.name)
+
+
+if __name__ == "__main__":
+    main()
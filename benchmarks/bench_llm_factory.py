@@ -0,0 +1,53 @@
+# benchmarks/bench_llm_factory.py
+#
+# Per-rerun LLM setup cost: the old way (a fresh Groq client and
+# ConversationChain on every script run) versus what the app does now, a
+# get_routed_llm() lookup in the process-wide client cache.
+#
+#   python benchmarks/bench_llm_factory.py --reruns 200
+#
+# No request is sent, so any non-empty API key works.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from langchain.chains import ConversationChain
+from langchain.memory import ConversationBufferMemory
+from langchain_groq import ChatGroq
+
+from tools.llm_factory import get_routed_llm
+
+MODEL = "mixtral-8x7b-32768"
+
+
+def per_rerun(fn, reruns):
+    fn()  # first run builds the cached clients; later reruns are what repeat
+    start = time.perf_counter()
+    for _ in range(reruns):
+        fn()
+    return (time.perf_counter() - start) / reruns * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=200)
+    args = parser.parse_args()
+    api_key = os.getenv("GROQ_API_KEY") or "bench-key"
+    session_state = {"memory": ConversationBufferMemory(return_messages=True)}
+
+    def uncached():
+        llm = ChatGroq(api_key=api_key, model=MODEL)
+        ConversationChain(llm=llm, memory=session_state["memory"], verbose=False)
+
+    def cached():
+        get_routed_llm("chat", api_key=api_key)
+
+    print(f"new client + chain each rerun: {per_rerun(uncached, args.reruns):8.3f} ms/rerun")
+    print(f"get_routed_llm (cached):       {per_rerun(cached, args.reruns):8.3f} ms/rerun")
+
+
+if __name__ == "__main__":
+    main()
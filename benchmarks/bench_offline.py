@@ -0,0 +1,105 @@
+# benchmarks/bench_offline.py
+#
+# Whole-app throughput against the local fakes in tools/fake_providers.py:
+# simulated users hit the weather/news fan-out, cached wellness answers and
+# streamed answers for a fixed time, then latency percentiles and the
+# gateway, router and cache counters are printed.
+#
+#   python benchmarks/bench_offline.py --users 50 --seconds 30
+#   SMARTLIFE_FAKE_LLM="median=1.5,rate_limit_rate=0.05" python benchmarks/bench_offline.py
+#
+# No API keys or network are needed; every upstream is faked.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("SMARTLIFE_FAKE_PROVIDERS", "all")
+os.environ.setdefault("LLM_CACHE_PATH", os.path.join(tempfile.mkdtemp(), "llm_responses.db"))
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.api_cache import api_cache_stats
+from tools.fanout import fetch_city_updates
+from tools.llm_cache import cache_stats
+from tools.llm_factory import get_routed_llm
+from tools.llm_gateway import gateway_stats, set_current_user
+from tools.llm_router import router_stats
+from tools.llm_streaming import stream_llm
+from tools.news_tool import get_top_news
+from tools.smartlife_features import get_contextual_wellness_response
+from tools.weather_tool import get_weather
+
+CITIES = ["Coimbatore", "Chennai", "Bengaluru", "Mumbai", "Delhi", "Pune", "Kochi", "Hyderabad"]
+MOODS = ["tired", "anxious", "happy", "stressed", "bored", "sleepy", "motivated", "sad"]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    llm = get_routed_llm("chat", api_key="offline")
+    timings = {"news": [], "wellness": [], "stream": []}
+    errors = {name: 0 for name in timings}
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.seconds
+
+    def news(rng):
+        fetch_city_updates(rng.sample(CITIES, 2), get_weather, get_top_news)
+
+    def wellness(rng):
+        get_contextual_wellness_response(f"I feel {rng.choice(MOODS)}", llm)
+
+    def stream(rng):
+        for _ in stream_llm(llm, f"Give me a tip for feeling {rng.choice(MOODS)}", use_cache=False):
+            pass
+
+    actions = {"news": news, "wellness": wellness, "stream": stream}
+
+    def user(index):
+        rng = random.Random(args.seed * 1000 + index)
+        set_current_user(f"user{index}")
+        while time.monotonic() < deadline:
+            name = rng.choice(list(actions))
+            start = time.perf_counter()
+            try:
+                actions[name](rng)
+            except Exception:
+                with lock:
+                    errors[name] += 1
+                continue
+            with lock:
+                timings[name].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(args.users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = sum(len(values) for values in timings.values())
+    print(f"{args.users} users, {args.seconds:.0f}s: {total} requests, {total / args.seconds:.1f} req/s")
+    for name, values in timings.items():
+        print(f"  {name:9s} n={len(values):5d}  p50={percentile(values, 0.5):6.3f}s  "
+              f"p95={percentile(values, 0.95):6.3f}s  errors={errors[name]}")
+    print("gateway:", json.dumps(gateway_stats(), default=float))
+    print("router:", json.dumps({m: {"wins": s["wins"], "errors": s["errors"], "p95": s["total"]["p95"]}
+                                 for m, s in router_stats().items()}))
+    print("api cache:", json.dumps(api_cache_stats()))
+    print("llm cache:", json.dumps(cache_stats()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_pdf_extract.py
+#
+# Pages/sec of PDF text extraction: the old single-core string concatenation
+# versus tools.pdf_extract.iter_pages() at several worker counts, plus the
+# peak RSS of this process.
+#
+#   python benchmarks/bench_pdf_extract.py manual.pdf handbook.pdf --workers 1 2 4 8
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from PyPDF2 import PdfReader
+
+from tools.pdf_extract import get_pool, iter_pages, shutdown_pools
+
+
+def old_concat(paths):
+    raw_text = ""
+    pages = 0
+    for path in paths:
+        for page in PdfReader(path).pages:
+            raw_text += page.extract_text() or ""
+            pages += 1
+    return pages
+
+
+def streamed(paths, workers):
+    pages = 0
+    for _ in iter_pages(paths, workers=workers):
+        pages += 1
+    return pages
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="+")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pages = old_concat(args.pdfs)
+    elapsed = time.perf_counter() - start
+    print(f"old += concat:      {pages / elapsed:8.1f} pages/s  ({pages} pages, peak RSS {peak_rss_mb():.0f} MB)")
+
+    for workers in args.workers:
+        if workers > 1:
+            # Start the workers first so spawn time isn't counted
+            list(get_pool(workers).map(abs, range(workers)))
+        start = time.perf_counter()
+        pages = streamed(args.pdfs, workers)
+        elapsed = time.perf_counter() - start
+        print(f"iter_pages x{workers:<3d}     {pages / elapsed:8.1f} pages/s  (peak RSS {peak_rss_mb():.0f} MB)")
+    shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
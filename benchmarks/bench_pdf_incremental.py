@@ -0,0 +1,90 @@
+# benchmarks/bench_pdf_incremental.py
+#
+# Time-to-answer after adding one small PDF to a large, already indexed set:
+# rebuilding a single index over every file (the old behaviour) versus the
+# per-file indexes and merged retriever in tools/pdf_index.py. "Answer" here
+# is the retrieval step; LLM generation costs the same either way.
+#
+#   python benchmarks/bench_pdf_incremental.py big1.pdf big2.pdf --add small.pdf
+#   python benchmarks/bench_pdf_incremental.py big.pdf --add small.pdf --embeddings fake
+#
+# Caches go to a temporary directory, so every run starts cold.
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bench-pdf-")
+os.environ["PDF_INDEX_DIR"] = os.path.join(_tmp, "indexes")
+os.environ["EMBED_CACHE_DIR"] = os.path.join(_tmp, "embeddings")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.embedding_cache import CachedEmbeddings
+from tools.pdf_index import EMBEDDING_MODEL, MergedRetriever, build_vectorstore, get_file_indexes
+
+QUERY = "What are the main points of this document?"
+
+
+class Upload(io.BytesIO):
+    """Stands in for a Streamlit UploadedFile."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+
+
+def load_embeddings(kind):
+    if kind == "fake":
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=384)
+    from langchain.embeddings import HuggingFaceEmbeddings
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="+", help="the large set already uploaded")
+    parser.add_argument("--add", required=True, help="the small PDF added afterwards")
+    parser.add_argument("--embeddings", choices=["hf", "fake"], default="hf")
+    args = parser.parse_args()
+
+    model = load_embeddings(args.embeddings)
+    base = [Upload(path) for path in args.pdfs]
+    added = Upload(args.add)
+
+    # Old: one index over every file, rebuilt from scratch when the set changes
+    start = time.perf_counter()
+    vectorstore = build_vectorstore(base + [added], model)
+    vectorstore.similarity_search(QUERY, k=4)
+    rebuild = time.perf_counter() - start
+
+    # New: the large set is indexed once up front...
+    embeddings = CachedEmbeddings(model, EMBEDDING_MODEL)
+    start = time.perf_counter()
+    get_file_indexes(base, embeddings, lambda file: build_vectorstore([file], embeddings))
+    initial = time.perf_counter() - start
+
+    # ...then adding a file indexes only that file
+    start = time.perf_counter()
+    indexes = get_file_indexes(base + [added], embeddings, lambda file: build_vectorstore([file], embeddings))
+    MergedRetriever(embeddings=embeddings, indexes=indexes, k=4).invoke(QUERY)
+    incremental = time.perf_counter() - start
+
+    # ...and removing one just leaves it out
+    start = time.perf_counter()
+    indexes = get_file_indexes(base[1:] + [added], embeddings, lambda file: build_vectorstore([file], embeddings))
+    MergedRetriever(embeddings=embeddings, indexes=indexes, k=4).invoke(QUERY)
+    removal = time.perf_counter() - start
+
+    print(f"full rebuild after adding {added.name}: {rebuild:8.2f} s")
+    print(f"per-file indexes, initial set:         {initial:8.2f} s (paid once)")
+    print(f"per-file indexes, after adding:        {incremental:8.2f} s")
+    print(f"per-file indexes, after removing one:  {removal:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/bench_startup.py
+#
+# Times, in a fresh interpreter each run, how long it takes to import the
+# Mongo-backed login/signup modules and to make the first users lookup.
+#
+#   MONGO_URI=mongodb://localhost:27017 python benchmarks/bench_startup.py
+#   MONGO_URI=mongomock:// python benchmarks/bench_startup.py
+#
+# Run it on a checkout before and after a change to compare startup cost.
+
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RUNS = 5
+
+SNIPPET = """
+import time
+t0 = time.perf_counter()
+import ui.login_page, ui.signup_page
+t1 = time.perf_counter()
+from db import mongo_connection
+mongo_connection.get_db().users.find_one({"username": "__startup_probe__"})
+t2 = time.perf_counter()
+print(t1 - t0, t2 - t1)
+"""
+
+
+def main():
+    imports, lookups = [], []
+    for _ in range(RUNS):
+        out = subprocess.run(
+            [sys.executable, "-c", SNIPPET], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(out[-2]))
+        lookups.append(float(out[-1]))
+    print(f"import login/signup pages: {statistics.median(imports) * 1000:8.1f} ms (median of {RUNS})")
+    print(f"first users lookup:        {statistics.median(lookups) * 1000:8.1f} ms (median of {RUNS})")
+
+
+if __name__ == "__main__":
+    main()
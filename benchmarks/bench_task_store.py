@@ -0,0 +1,100 @@
+# benchmarks/bench_task_store.py
+#
+# Compares the JSON (snapshot + journal) and SQLite task stores.
+#
+#   python benchmarks/bench_task_store.py                  # 10k, 100k, 1M tasks
+#   python benchmarks/bench_task_store.py --sizes 10000
+
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.task_store import TaskStore
+from tools.task_store_sqlite import SqliteTaskStore
+
+USERS = 1000
+DAYS = 3 * 365
+START = datetime.date(2023, 1, 1)
+LOOKUPS = 1000
+
+
+def make_tasks(n, rng):
+    for i in range(n):
+        yield {
+            "username": f"user{rng.randrange(USERS)}",
+            "date": (START + datetime.timedelta(days=rng.randrange(DAYS))).isoformat(),
+            "task": f"task {i}",
+            "completed": rng.random() < 0.6,
+        }
+
+
+def timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench(name, open_store, n, tasks, rng):
+    store = open_store()
+    load = timed(lambda: store.replace_all(tasks))
+    store.close()
+
+    start = time.perf_counter()
+    store = open_store()
+    cold = time.perf_counter() - start
+
+    queries = [
+        (f"user{rng.randrange(USERS)}", START + datetime.timedelta(days=rng.randrange(DAYS - 31)))
+        for _ in range(LOOKUPS)
+    ]
+    it = iter(queries * 4)
+
+    def day():
+        u, d = next(it)
+        store.get(u, d.isoformat())
+
+    def month():
+        u, d = next(it)
+        store.get_range(u, d.isoformat(), (d + datetime.timedelta(days=30)).isoformat())
+
+    def counts():
+        u, d = next(it)
+        store.daily_counts(u, d.isoformat(), (d + datetime.timedelta(days=30)).isoformat())
+
+    def add_complete():
+        u, d = next(it)
+        store.complete(store.add(u, d.isoformat(), "bench"), u)
+
+    results = {
+        "bulk load (s)": load,
+        "cold open (s)": cold,
+        "get day (ms)": timed(day, LOOKUPS) * 1000,
+        "month range (ms)": timed(month, LOOKUPS) * 1000,
+        "month counts (ms)": timed(counts, LOOKUPS) * 1000,
+        "add+complete (ms)": timed(add_complete, LOOKUPS) * 1000,
+    }
+    store.close()
+    print(f"{name:<7} {n:>9,}  " + "  ".join(f"{k} {v:8.3f}" for k, v in results.items()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        rng = random.Random(n)
+        tasks = list(make_tasks(n, rng))
+        directory = tempfile.mkdtemp()
+        bench("json", lambda: TaskStore(os.path.join(directory, "tasks.json")), n, tasks, rng)
+        bench("sqlite", lambda: SqliteTaskStore(os.path.join(directory, "tasks.db")), n, tasks, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# benchmarks/check_embedding_quality.py
+#
+# Retrieval-quality regression check for the quantized ONNX embedding backend
+# (tools/embedding_backends.py) against the full-precision model it replaces.
+# Both embed the same chunks and queries, then we compare:
+#   cosine    similarity of the two vectors for each chunk
+#   overlap@k share of the reference's top-k chunks the ONNX backend also returns
+#   top-1     how often both put the same chunk first
+# Exits with status 1 when the ONNX backend falls below the thresholds.
+#
+#   python benchmarks/check_embedding_quality.py                 # built-in sample
+#   python benchmarks/check_embedding_quality.py manual.pdf --queries 100 -k 4
+#
+# With PDFs, queries are word windows taken from a sample of the chunks.
+
+import argparse
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.embedding_backends import load_embeddings
+from tools.pdf_index import EMBEDDING_MODEL, iter_documents
+
+SAMPLE_CHUNKS = [
+    "Invoices must be submitted within thirty days of delivery. Late invoices are paid in the next cycle.",
+    "Employees accrue two vacation days per month, up to a maximum balance of thirty days.",
+    "The warranty covers manufacturing defects for two years but not accidental damage or water exposure.",
+    "To reset the router, hold the recessed button on the back for ten seconds until the lights blink.",
+    "Photosynthesis converts light energy, water and carbon dioxide into glucose and oxygen.",
+    "The mitochondria produce most of the cell's ATP through oxidative phosphorylation.",
+    "Interest is compounded monthly; the annual percentage yield is higher than the nominal rate.",
+    "A balanced diet includes vegetables, whole grains, lean protein and limited added sugar.",
+    "Regular aerobic exercise lowers resting heart rate and improves sleep quality.",
+    "The library is open from nine to six on weekdays and closed on public holidays.",
+    "Passwords must be at least twelve characters and are rotated every ninety days.",
+    "Backups run nightly at two a.m. and are kept for thirty-five days in a separate region.",
+    "The contract may be terminated by either party with sixty days' written notice.",
+    "Rainfall in the region peaks in July, when the monsoon brings most of the annual total.",
+    "The French Revolution began in 1789 with the storming of the Bastille.",
+    "Python lists are dynamic arrays; appending is amortized constant time.",
+    "Meetings longer than an hour need an agenda shared at least a day in advance.",
+    "The recipe calls for two cups of flour, one egg and a pinch of salt, baked for twenty minutes.",
+    "Customers can return unopened items within fourteen days for a full refund.",
+    "The telescope's mirror is 2.4 meters across and orbits above the atmosphere.",
+    "Remote employees are reimbursed for internet costs up to fifty dollars a month.",
+    "Antibiotics treat bacterial infections but have no effect on viruses such as the flu.",
+    "The bridge was closed for repairs after inspectors found corrosion in the steel cables.",
+    "Quarterly revenue grew twelve percent, driven mainly by subscriptions in Europe.",
+]
+
+SAMPLE_QUERIES = [
+    "How long do I have to send an invoice?",
+    "How many vacation days do I get?",
+    "Does the warranty cover water damage?",
+    "How do I reset my router?",
+    "What does photosynthesis produce?",
+    "How often are backups taken and how long are they kept?",
+    "How much notice is needed to end the contract?",
+    "Can I get my money back for a product?",
+    "What is the password policy?",
+    "Why did revenue go up last quarter?",
+    "When is the library open?",
+    "Do antibiotics work against the flu?",
+]
+
+
+def pdf_corpus(paths, queries, seed):
+    chunks = [doc.page_content for doc in iter_documents(paths)]
+    rng = random.Random(seed)
+    picked = []
+    for chunk in rng.sample(chunks, min(queries, len(chunks))):
+        words = chunk.split()
+        start = rng.randrange(max(1, len(words) - 12))
+        picked.append(" ".join(words[start:start + 12]))
+    return chunks, picked
+
+
+def normalized(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+
+
+def top_k(queries, chunks, k):
+    return np.argsort(-(queries @ chunks.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--queries", type=int, default=50, help="queries drawn from the PDFs")
+    parser.add_argument("-k", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reference", default=EMBEDDING_MODEL, help="sentence-transformers model or directory")
+    parser.add_argument("--min-cosine", type=float, default=0.98)
+    parser.add_argument("--min-overlap", type=float, default=0.9)
+    args = parser.parse_args()
+
+    if args.pdfs:
+        chunks, queries = pdf_corpus(args.pdfs, args.queries, args.seed)
+    else:
+        chunks, queries = SAMPLE_CHUNKS, SAMPLE_QUERIES
+    if not chunks:
+        sys.exit("No text found in the PDFs.")
+    k = min(args.k, len(chunks))
+
+    from langchain.embeddings import HuggingFaceEmbeddings
+    reference = HuggingFaceEmbeddings(model_name=args.reference)
+    candidate = load_embeddings("onnx-int8")
+
+    ref_chunks = normalized(reference.embed_documents(chunks))
+    ref_queries = normalized([reference.embed_query(q) for q in queries])
+    onnx_chunks = normalized(candidate.embed_documents(chunks))
+    onnx_queries = normalized([candidate.embed_query(q) for q in queries])
+
+    cosine = (ref_chunks * onnx_chunks).sum(axis=1)
+    ref_top = top_k(ref_queries, ref_chunks, k)
+    onnx_top = top_k(onnx_queries, onnx_chunks, k)
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, onnx_top)])
+    top1 = np.mean(ref_top[:, 0] == onnx_top[:, 0])
+
+    print(f"{len(chunks)} chunks, {len(queries)} queries, k={k}")
+    print(f"cosine to reference: mean {cosine.mean():.4f}, min {cosine.min():.4f}")
+    print(f"overlap@{k}:          {overlap:.3f}")
+    print(f"top-1 agreement:     {top1:.3f}")
+
+    if cosine.mean() < args.min_cosine or overlap < args.min_overlap:
+        print(f"❌ Below thresholds (cosine >= {args.min_cosine}, overlap@{k} >= {args.min_overlap})")
+        sys.exit(1)
+    print("✅ ONNX int8 backend matches the reference")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# benchmarks/check_http_client.py
+#
+# Checks tools/http_client.py against a local mock server: keep-alive reuse,
+# read timeouts, retries on 503, the circuit breaker opening and recovering,
+# and recovery after a half-open trial that fails with an unexpected error.
+# Exits with status 1 if any check fails.
+#
+#   python benchmarks/check_http_client.py
+
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Small limits so the breaker cases run in well under a second
+os.environ.setdefault("HTTP_BREAKER_THRESHOLD", "3")
+os.environ.setdefault("HTTP_BREAKER_COOLDOWN", "0.3")
+os.environ.setdefault("HTTP_BACKOFF", "0.01")
+os.environ["SMARTLIFE_FAKE_PROVIDERS"] = ""
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import requests
+
+from tools import http_client
+from tools.http_client import BREAKER_COOLDOWN, BREAKER_THRESHOLD, CircuitOpenError
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    hits = {}
+    ports = set()
+    failures_left = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=b"ok"):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # the client already gave up (the timeout check)
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        MockHandler.hits[path] = MockHandler.hits.get(path, 0) + 1
+        MockHandler.ports.add(self.client_address[1])
+        if path == "/ok":
+            self._reply(200)
+        elif path == "/down":
+            self._reply(503, b"down")
+        elif path == "/flaky":
+            # 503 until the configured number of failures is used up
+            left = MockHandler.failures_left.get(path, 0)
+            MockHandler.failures_left[path] = left - 1
+            self._reply(503 if left > 0 else 200)
+        elif path == "/slow":
+            time.sleep(1)
+            self._reply(200)
+        elif path == "/broken":
+            # A chunked body cut off mid-chunk -> ChunkedEncodingError on the client
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self.wfile.write(b"zz\r\nnot a chunk")
+            self.wfile.flush()
+            self.close_connection = True
+        else:
+            self._reply(404, b"missing")
+
+
+def check_keep_alive(base):
+    MockHandler.ports.clear()
+    for _ in range(5):
+        http_client.get(f"{base}/ok")
+    return len(MockHandler.ports) == 1, f"{len(MockHandler.ports)} connection(s) for 5 requests"
+
+
+def check_timeout(base):
+    start = time.perf_counter()
+    try:
+        http_client.get(f"{base}/slow", timeout=(1, 0.2), retries=0)
+    except requests.exceptions.Timeout:
+        elapsed = time.perf_counter() - start
+        return elapsed < 0.9, f"timed out after {elapsed:.2f}s"
+    return False, "no timeout raised"
+
+
+def check_retry(base):
+    MockHandler.failures_left["/flaky"] = BREAKER_THRESHOLD - 1
+    response = http_client.get(f"{base}/flaky", retries=BREAKER_THRESHOLD - 1)
+    return response.status_code == 200, f"status {response.status_code} after {MockHandler.hits['/flaky']} attempts"
+
+
+def check_breaker_opens_and_recovers(base):
+    for _ in range(BREAKER_THRESHOLD):
+        http_client.get(f"{base}/down", retries=0)
+    try:
+        http_client.get(f"{base}/ok", retries=0)
+        return False, "breaker did not open"
+    except CircuitOpenError:
+        pass
+    time.sleep(BREAKER_COOLDOWN + 0.05)
+    response = http_client.get(f"{base}/ok", retries=0)
+    return response.status_code == 200, f"half-open trial returned {response.status_code}"
+
+
+def check_failed_trial_does_not_wedge(base):
+    for _ in range(BREAKER_THRESHOLD):
+        http_client.get(f"{base}/down", retries=0)
+    time.sleep(BREAKER_COOLDOWN + 0.05)
+    try:
+        http_client.get(f"{base}/broken", retries=0)
+    except CircuitOpenError:
+        return False, "trial was refused"
+    except requests.exceptions.RequestException:
+        pass  # the trial itself fails; the breaker must notice
+    time.sleep(BREAKER_COOLDOWN + 0.05)
+    try:
+        response = http_client.get(f"{base}/ok", retries=0)
+    except CircuitOpenError:
+        return False, "host still refused after the cooldown"
+    return response.status_code == 200, f"next trial returned {response.status_code}"
+
+
+CHECKS = [
+    check_keep_alive,
+    check_timeout,
+    check_retry,
+    check_breaker_opens_and_recovers,
+    check_failed_trial_does_not_wedge,
+]
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    failed = 0
+    for check in CHECKS:
+        http_client.reset()
+        ok, detail = check(base)
+        print(f"{'✅' if ok else '❌'} {check.__name__}: {detail}")
+        failed += not ok
+    server.shutdown()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/stress_task_store.py
+#
+# Hammers one tasks.json from several processes, each running several threads,
+# then reloads the file and checks that no add or complete was lost.
+#
+#   python benchmarks/stress_task_store.py --processes 4 --threads 8 --tasks 200
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.task_store import TaskStore
+
+
+def _writer(path, worker, threads, tasks, compact_every):
+    store = TaskStore(path, compact_every=compact_every)
+
+    def run(thread):
+        username = f"user{worker}_{thread}"
+        for i in range(tasks):
+            task_id = store.add(username, "2025-07-18", f"task {i}")
+            if i % 2 == 0:
+                store.complete(task_id, username)
+
+    pool = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--compact-every", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "tasks.json")
+    start = time.perf_counter()
+    procs = [
+        multiprocessing.Process(
+            target=_writer,
+            args=(path, p, args.threads, args.tasks, args.compact_every),
+        )
+        for p in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    tasks = TaskStore(path).all_tasks()
+    expected = args.processes * args.threads * args.tasks
+    expected_completed = args.processes * args.threads * ((args.tasks + 1) // 2)
+    completed = sum(t["completed"] for t in tasks)
+    print(f"{len(tasks)}/{expected} tasks, {completed}/{expected_completed} completed "
+          f"in {elapsed:.2f}s ({expected / elapsed:.0f} adds/s)")
+    if len(tasks) != expected or completed != expected_completed:
+        print("❌ Lost updates detected")
+        sys.exit(1)
+    print("✅ No lost updates")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# db/auth_service.py
+#
+# The one place SmartLife pages go to sign users up, log them in and check
+# their session. Accounts and sessions live in MongoDB when MONGO_URI is set,
+# otherwise in a local SQLite file, so every server process sees the same users.
+
+import datetime
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from db import mongo_connection
+from tools.ttl_cache import TTLCache
+
+# PBKDF2-SHA256 rounds for new hashes; raise it as hardware gets faster
+AUTH_KDF_ITERATIONS = int(os.getenv("AUTH_KDF_ITERATIONS", "600000"))
+# Threads that run password hashing, so a burst of logins can't take every core
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", "4"))
+# How long a login stays valid
+SESSION_TTL = int(os.getenv("AUTH_SESSION_TTL", str(7 * 24 * 3600)))
+# Verified sessions kept in memory, and for how long before asking the store again.
+# The TTL is also how long other server processes may still accept a token after
+# logout, so keep it short.
+SESSION_CACHE_SIZE = int(os.getenv("AUTH_SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL = int(os.getenv("AUTH_SESSION_CACHE_TTL", "30"))
+# Used when MONGO_URI is not set
+LOCAL_USERS_DB = os.getenv("AUTH_LOCAL_DB", "users.db")
+
+_kdf_pool = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="auth-kdf")
+_sessions = TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+
+
+# --- Password hashing ---
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+
+
+def hash_password(password, iterations=None):
+    iterations = iterations or AUTH_KDF_ITERATIONS
+    salt = secrets.token_bytes(16)
+    digest = _pbkdf2(password, salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, stored):
+    """``(matches, needs_rehash)``; also accepts the old unsalted SHA-256 hex hashes."""
+    if stored.startswith("pbkdf2_sha256$"):
+        _, iterations, salt, digest = stored.split("$")
+        candidate = _pbkdf2(password, bytes.fromhex(salt), int(iterations))
+        ok = hmac.compare_digest(candidate.hex(), digest)
+        return ok, ok and int(iterations) < AUTH_KDF_ITERATIONS
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    ok = hmac.compare_digest(legacy, stored)
+    return ok, ok
+
+
+_DUMMY_HASH = None
+
+
+# Spend the same KDF time on unknown usernames so response time doesn't reveal them
+def _dummy_verify(password):
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password("smartlife-dummy")
+    verify_password(password, _DUMMY_HASH)
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# --- Backing stores ---
+
+class MongoUserStore:
+    """Users and sessions in MongoDB (see db/users.py)."""
+
+    def create_user(self, username, password_hash):
+        from db import users
+        return users.create_user(username, password_hash)
+
+    def get_password_hash(self, username):
+        from db import users
+        return users.get_password_hash(username)
+
+    def set_password_hash(self, username, password_hash):
+        from db import users
+        users.set_password_hash(username, password_hash)
+
+    def save_session(self, token_hash, username, expires_at):
+        from db import users
+        expires = datetime.datetime.fromtimestamp(expires_at, datetime.timezone.utc)
+        users.save_session(token_hash, username, expires)
+
+    def get_session(self, token_hash):
+        from db import users
+        session = users.get_session(token_hash)
+        if session is None:
+            return None
+        username, expires = session
+        if expires.tzinfo is None:
+            expires = expires.replace(tzinfo=datetime.timezone.utc)
+        return username, expires.timestamp()
+
+    def delete_session(self, token_hash):
+        from db import users
+        users.delete_session(token_hash)
+
+
+class SqliteUserStore:
+    """Users and sessions in a local SQLite file, for running without MongoDB."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        password TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sessions (
+        token_hash TEXT PRIMARY KEY,
+        username   TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def create_user(self, username, password_hash):
+        try:
+            with self._conn() as conn:
+                conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password_hash))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def get_password_hash(self, username):
+        row = self._conn().execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return row[0] if row else None
+
+    def set_password_hash(self, username, password_hash):
+        with self._conn() as conn:
+            conn.execute("UPDATE users SET password = ? WHERE username = ?", (password_hash, username))
+
+    def save_session(self, token_hash, username, expires_at):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "INSERT INTO sessions (token_hash, username, expires_at) VALUES (?, ?, ?)",
+                (token_hash, username, expires_at),
+            )
+
+    def get_session(self, token_hash):
+        row = self._conn().execute(
+            "SELECT username, expires_at FROM sessions WHERE token_hash = ?", (token_hash,)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def delete_session(self, token_hash):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM sessions WHERE token_hash = ?", (token_hash,))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_user_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = MongoUserStore() if mongo_connection.MONGO_URI else SqliteUserStore(LOCAL_USERS_DB)
+    return _store
+
+
+# --- Public API ---
+
+def register(username, password):
+    """Create an account; returns False if the username is taken."""
+    password_hash = _kdf_pool.submit(hash_password, password).result()
+    return get_user_store().create_user(username, password_hash)
+
+
+def _check_password(username, password):
+    store = get_user_store()
+    stored = store.get_password_hash(username)
+    if stored is None:
+        _dummy_verify(password)
+        return False
+    ok, needs_rehash = verify_password(password, stored)
+    if needs_rehash:
+        store.set_password_hash(username, hash_password(password))
+    return ok
+
+
+def login(username, password):
+    """Check the password on the KDF pool; returns a new session token or None."""
+    if not _kdf_pool.submit(_check_password, username, password).result():
+        return None
+    token = secrets.token_urlsafe(32)
+    expires_at = time.time() + SESSION_TTL
+    get_user_store().save_session(_token_hash(token), username, expires_at)
+    _sessions.set(token, (username, expires_at))
+    return token
+
+
+def resolve_session(token):
+    """Username for a live session token, or None. Cached, so reruns skip the store."""
+    if not token:
+        return None
+    cached = _sessions.get(token)
+    if cached is None:
+        cached = get_user_store().get_session(_token_hash(token))
+        if cached is None:
+            return None
+        _sessions.set(token, cached)
+    username, expires_at = cached
+    if expires_at <= time.time():
+        _sessions.pop(token)
+        return None
+    return username
+
+
+def logout(token):
+    if token:
+        _sessions.pop(token)
+        get_user_store().delete_session(_token_hash(token))
+
+
+def session_cache_stats():
+    return _sessions.stats()
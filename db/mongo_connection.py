@@ -1,12 +1,131 @@
 # db/mongo_connection.py
-from pymongo import MongoClient
+
 import os
+import threading
+import time
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
-MONGO_URI = os.getenv("MONGO_URI")  # example: mongodb://localhost:27017
+MONGO_URI = os.getenv("MONGO_URI")  # example: mongodb://localhost:27017, or mongomock:// in tests
 DB_NAME = "smartlife_db"
 
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
+# Pool and timeout settings, overridable from the environment
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "3000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "3000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+# Seconds between pings made by the background health monitor
+MONGO_HEALTH_CHECK_INTERVAL = float(os.getenv("MONGO_HEALTH_CHECK_INTERVAL", "30"))
+
+_client = None
+_client_lock = threading.Lock()
+_health = {"healthy": None, "checked_at": None}
+_monitor_started = False
+_monitor_lock = threading.Lock()
+
+
+def _create_client(uri):
+    # Imported here so that importing this module never pays for pymongo.
+    if uri.startswith("mongomock://"):
+        import mongomock
+        return mongomock.MongoClient()
+
+    from pymongo import MongoClient
+    return MongoClient(
+        uri,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        connect=False,  # open sockets on first use, not at construction
+    )
+
+
+# Process-wide client, created on first call and shared by every session
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                if not MONGO_URI:
+                    raise RuntimeError("MONGO_URI is not set. Add it to `.env` or the environment.")
+                _client = _create_client(MONGO_URI)
+                start_health_monitor()
+    return _client
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
+
+# Use an existing client (e.g. mongomock.MongoClient() in tests) instead of MONGO_URI
+def set_client(client):
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
+
+
+def close_client():
+    set_client(None)
+
+
+def ping(client=None):
+    try:
+        (client if client is not None else get_client()).admin.command("ping")
+        return True
+    except Exception as e:
+        print(f"[❌ MongoDB ping failed] {e}")
+        return False
+
+
+def _monitor():
+    while True:
+        client = _client
+        if client is not None:
+            try:
+                client.admin.command("ping")
+                healthy, error = True, None
+            except Exception as e:
+                healthy, error = False, e
+            # Log changes only, not every ping during an outage
+            if healthy != _health["healthy"]:
+                print("[✅ MongoDB reachable]" if healthy else f"[❌ MongoDB ping failed] {error}")
+            _health.update(healthy=healthy, checked_at=time.time())
+        time.sleep(MONGO_HEALTH_CHECK_INTERVAL)
+
+
+# Pings run on their own thread, never a user's: a dead server would otherwise
+# stall a rerun for serverSelectionTimeoutMS. The client is never closed here;
+# other sessions may be using it, and pymongo reconnects by itself once the
+# server is back.
+def start_health_monitor():
+    global _monitor_started
+    with _monitor_lock:
+        if _monitor_started:
+            return
+        _monitor_started = True
+    threading.Thread(target=_monitor, daemon=True, name="mongo-health").start()
+
+
+def check_health():
+    """Result of the latest background ping: True, False, or None before the first one.
+
+    Never blocks; starts the monitor if it isn't running yet.
+    """
+    start_health_monitor()
+    return _health["healthy"]
+
+
+# Old callers did `from db.mongo_connection import db`; keep that working lazily.
+def __getattr__(name):
+    if name == "db":
+        return get_db()
+    if name == "client":
+        return get_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
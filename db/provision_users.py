@@ -0,0 +1,76 @@
+# db/provision_users.py
+#
+# Onboard a whole organisation from a CSV with "username,password" columns.
+#
+#   python -m db.provision_users staff.csv
+#
+# Passwords are hashed before they leave this process; usernames that already
+# exist are reported and skipped.
+#
+#   python -m db.provision_users --report-duplicates
+#   python -m db.provision_users --dedupe
+#
+# Collections filled by the old find-then-insert signup can hold the same
+# username twice, which stops the unique index from being built. --dedupe
+# keeps the oldest account for each such name, removes the others and then
+# builds the index.
+
+import argparse
+import csv
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from db.auth_service import AUTH_WORKERS, hash_password
+from db.users import dedupe_users, provision_users
+
+
+def read_users(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            username = (row.get("username") or "").strip()
+            password = row.get("password") or ""
+            if username and password:
+                yield username, password
+
+
+def hashed_users(path):
+    # PBKDF2 releases the GIL, so hashing spreads across the worker threads.
+    with ThreadPoolExecutor(max_workers=AUTH_WORKERS) as pool:
+        rows = read_users(path)
+        while True:
+            chunk = [row for _, row in zip(range(256), rows)]
+            if not chunk:
+                break
+            hashes = pool.map(hash_password, [password for _, password in chunk])
+            for (username, _), password_hash in zip(chunk, hashes):
+                yield {"username": username, "password": password_hash}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-create SmartLife users from a CSV file.")
+    parser.add_argument("csv_file", nargs="?", help="CSV with username and password columns")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--report-duplicates", action="store_true", help="list usernames held by several accounts")
+    parser.add_argument("--dedupe", action="store_true", help="keep the oldest account per username, delete the rest")
+    args = parser.parse_args()
+
+    if args.report_duplicates or args.dedupe:
+        names, removed = dedupe_users(dry_run=not args.dedupe)
+        for name in names:
+            print(f"  {name}")
+        if args.dedupe:
+            print(f"✅ Removed {removed} duplicate accounts across {len(names)} usernames; unique index built")
+        else:
+            print(f"⚠️ {len(names)} usernames are held by more than one account")
+        return
+    if not args.csv_file:
+        parser.error("csv_file is required unless --report-duplicates or --dedupe is given")
+
+    inserted, duplicates = provision_users(hashed_users(args.csv_file), args.batch_size)
+    print(f"✅ Created {inserted} users ({duplicates} usernames already existed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# db/users.py
+
+import threading
+
+from db.mongo_connection import get_db
+
+DUPLICATE_KEY = 11000
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+# The users collection, with its unique username index created once per process
+def get_users_collection():
+    global _indexes_ready
+    users = get_db().users
+    if not _indexes_ready:
+        with _indexes_lock:
+            if not _indexes_ready:
+                try:
+                    users.create_index("username", unique=True, name="username_unique")
+                except Exception as e:
+                    # Signups from before the index could race into duplicate names.
+                    # Keep auth working and say which ones; dedupe_users() fixes them.
+                    if getattr(e, "code", None) != DUPLICATE_KEY:
+                        raise
+                    clashes = ", ".join(name for name, _ in duplicate_usernames(users)[:20])
+                    print(f"[⚠️ users] unique username index not built; duplicate usernames: {clashes}. "
+                          "Run `python -m db.provision_users --dedupe` to fix them.")
+                _indexes_ready = True
+    return users
+
+
+def duplicate_usernames(users=None):
+    """``[(username, [_id, ...])]`` for every username held by more than one document."""
+    users = users if users is not None else get_db().users
+    groups = users.aggregate([
+        {"$group": {"_id": "$username", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    return [(group["_id"], sorted(group["ids"])) for group in groups]
+
+
+def dedupe_users(dry_run=True):
+    """Keep the oldest account for each duplicated username and delete the rest.
+
+    Returns ``(usernames, removed)``. With ``dry_run`` nothing is deleted.
+    Builds the unique index afterwards, so new duplicates can't appear.
+    """
+    global _indexes_ready
+    users = get_db().users
+    clashes = duplicate_usernames(users)
+    removed = 0
+    if not dry_run:
+        for _, ids in clashes:
+            # ObjectIds sort by creation time, so ids[0] is the account that signed up first
+            removed += users.delete_many({"_id": {"$in": ids[1:]}}).deleted_count
+        users.create_index("username", unique=True, name="username_unique")
+        _indexes_ready = True
+    return [name for name, _ in clashes], removed
+
+
+def create_user(username, password_hash):
+    """Insert a user in one round trip; returns False if the username is taken."""
+    from pymongo.errors import DuplicateKeyError
+
+    try:
+        get_users_collection().insert_one({"username": username, "password": password_hash})
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def get_password_hash(username):
+    """Stored password hash for ``username``, or None; fetches only that field."""
+    user = get_users_collection().find_one({"username": username}, {"password": 1, "_id": 0})
+    return user["password"] if user else None
+
+
+def provision_users(users, batch_size=1000):
+    """Bulk-insert ``{"username", "password"}`` docs; returns ``(inserted, duplicates)``.
+
+    Batches go through ``insert_many(ordered=False)``, so an existing username
+    only skips that one document instead of aborting the batch.
+    """
+    from pymongo.errors import BulkWriteError
+
+    collection = get_users_collection()
+    inserted = duplicates = 0
+    batch = []
+
+    def commit():
+        nonlocal inserted, duplicates
+        if not batch:
+            return
+        try:
+            inserted += len(collection.insert_many(batch, ordered=False).inserted_ids)
+        except BulkWriteError as e:
+            inserted += e.details.get("nInserted", 0)
+            errors = e.details.get("writeErrors", [])
+            duplicates += sum(1 for err in errors if err.get("code") == DUPLICATE_KEY)
+            if any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+        batch.clear()
+
+    for user in users:
+        batch.append(user)
+        if len(batch) >= batch_size:
+            commit()
+    commit()
+    return inserted, duplicates
+
+
+def set_password_hash(username, password_hash):
+    get_users_collection().update_one({"username": username}, {"$set": {"password": password_hash}})
+
+
+# --- Login sessions ---
+
+_session_indexes_ready = False
+
+
+# Sessions keyed by a hash of the token; Mongo drops them once expires_at passes
+def get_sessions_collection():
+    global _session_indexes_ready
+    sessions = get_db().sessions
+    if not _session_indexes_ready:
+        with _indexes_lock:
+            if not _session_indexes_ready:
+                sessions.create_index("token_hash", unique=True, name="token_hash_unique")
+                sessions.create_index("expires_at", expireAfterSeconds=0, name="expires_at_ttl")
+                _session_indexes_ready = True
+    return sessions
+
+
+def save_session(token_hash, username, expires_at):
+    get_sessions_collection().insert_one(
+        {"token_hash": token_hash, "username": username, "expires_at": expires_at}
+    )
+
+
+def get_session(token_hash):
+    """``(username, expires_at)`` for a session, or None."""
+    session = get_sessions_collection().find_one(
+        {"token_hash": token_hash}, {"username": 1, "expires_at": 1, "_id": 0}
+    )
+    return (session["username"], session["expires_at"]) if session else None
+
+
+def delete_session(token_hash):
+    get_sessions_collection().delete_one({"token_hash": token_hash})
@@ -0,0 +1,163 @@
+# tools/api_cache.py
+#
+# Process-wide cache for paid upstream lookups (weather, headlines) shared by
+# every Streamlit session. Entries are keyed by (source, normalized query),
+# served fresh for the source's TTL and then, for a while longer, served stale
+# while one background refresh fetches a new value. Concurrent misses for the
+# same key wait on a single upstream call instead of each making their own.
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Seconds a value is fresh, and how much longer it may be served while refreshing
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "900"))
+API_CACHE_STALE_TTL = float(os.getenv("API_CACHE_STALE_TTL", "3600"))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "2048"))
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="api-cache-refresh")
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+
+class SourceStats:
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    def as_dict(self):
+        served = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            # Requests answered without their own upstream call
+            "hit_rate": (served - self.misses) / served if served else 0.0,
+        }
+
+
+class StaleWhileRevalidateCache:
+    """LRU of ``(source, key) -> value`` with fresh/stale windows and single-flight fetches."""
+
+    def __init__(self, maxsize=API_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # (source, key) -> (value, fresh_until, stale_until)
+        self._inflight = {}         # (source, key) -> Future
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _source_stats(self, source):
+        stats = self._stats.get(source)
+        if stats is None:
+            stats = self._stats[source] = SourceStats()
+        return stats
+
+    def _store(self, cache_key, value, ttl, stale_ttl):
+        now = time.monotonic()
+        with self._lock:
+            self._data[cache_key] = (value, now + ttl, now + ttl + stale_ttl)
+            self._data.move_to_end(cache_key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _run_fetch(self, cache_key, future, fetch, ttl, stale_ttl, should_cache):
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._lock:
+                self._source_stats(cache_key[0]).errors += 1
+                self._inflight.pop(cache_key, None)
+            future.set_exception(e)
+            return
+        if should_cache is None or should_cache(value):
+            self._store(cache_key, value, ttl, stale_ttl)
+        with self._lock:
+            self._inflight.pop(cache_key, None)
+        future.set_result(value)
+
+    def get_or_fetch(self, source, key, fetch, ttl, stale_ttl=API_CACHE_STALE_TTL, should_cache=None):
+        """Cached value for ``(source, key)``, calling ``fetch()`` at most once at a time.
+
+        Values for which ``should_cache(value)`` is false (e.g. an
+        "unavailable" message) are returned but not stored.
+        """
+        cache_key = (source, key)
+        now = time.monotonic()
+        with self._lock:
+            stats = self._source_stats(source)
+            entry = self._data.get(cache_key)
+            if entry is not None and entry[2] > now:
+                self._data.move_to_end(cache_key)
+                if entry[1] > now:
+                    stats.hits += 1
+                    return entry[0]
+                stats.stale_hits += 1
+                if cache_key not in self._inflight:
+                    stats.refreshes += 1
+                    future = self._inflight[cache_key] = Future()
+                    _refresh_pool.submit(self._run_fetch, cache_key, future, fetch, ttl, stale_ttl, should_cache)
+                return entry[0]
+
+            future = self._inflight.get(cache_key)
+            if future is not None:
+                stats.coalesced += 1
+                leader = False
+            else:
+                stats.misses += 1
+                future = self._inflight[cache_key] = Future()
+                leader = True
+
+        if leader:
+            self._run_fetch(cache_key, future, fetch, ttl, stale_ttl, should_cache)
+        return future.result()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._stats.clear()
+
+    def stats(self):
+        with self._lock:
+            result = {source: stats.as_dict() for source, stats in self._stats.items()}
+            for source in result:
+                result[source]["size"] = sum(1 for key in self._data if key[0] == source)
+            return result
+
+
+_cache = StaleWhileRevalidateCache()
+
+
+def cached_source(source, ttl, stale_ttl=API_CACHE_STALE_TTL, should_cache=None):
+    """Decorator: cache ``fn(query)`` (or ``fn()``) under ``source`` in the shared cache."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = normalize_query(args[0]) if args else ""
+            return _cache.get_or_fetch(source, key, lambda: fn(*args), ttl, stale_ttl, should_cache)
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorate
+
+
+def api_cache_stats():
+    return _cache.stats()
+
+
+def clear_api_cache():
+    _cache.clear()
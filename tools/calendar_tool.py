@@ -1,52 +1,71 @@
-import json
+import datetime
 import os
 import random
 
+from tools.task_store import get_task_store
+from tools.task_store_sqlite import get_sqlite_task_store
+
 TASK_FILE = "tasks.json"
+TASK_DB = "tasks.db"
+# "json" (tasks.json + journal) or "sqlite" (tasks.db)
+TASK_BACKEND = os.getenv("SMARTLIFE_TASK_BACKEND", "json")
+
+# Task store for the configured backend; both expose the same methods
+def get_store():
+    if TASK_BACKEND == "sqlite":
+        return get_sqlite_task_store(TASK_DB)
+    return get_task_store(TASK_FILE)
 
 # Load tasks from file
 def load_tasks():
-    if not os.path.exists(TASK_FILE):
-        return []
-    with open(TASK_FILE, "r") as f:
-        return json.load(f)
+    return get_store().all_tasks()
 
 # Save tasks to file
 def save_tasks(tasks):
-    with open(TASK_FILE, "w") as f:
-        json.dump(tasks, f, indent=4)
+    get_store().replace_all(tasks)
 
-# Add a new task
+# Add a new task and return its ID
 def add_task(date, task, username):
-    tasks = load_tasks()
-    tasks.append({
-        "username": username,
-        "date": date,
-        "task": task,
-        "completed": False
-    })
-    save_tasks(tasks)
+    return get_store().add(username, date, task)
 
 # Get tasks by date and username
 def get_tasks(date, username):
-    tasks = load_tasks()
-    return [task for task in tasks if task["username"] == username and task["date"] == date]
+    return get_store().get(username, date)
+
+# Get tasks between two dates (inclusive), ordered by date
+def get_tasks_between(start_date, end_date, username):
+    return get_store().get_range(username, start_date, end_date)
+
+# Get (date, total, completed) for each day with tasks between two dates
+def get_daily_counts(start_date, end_date, username):
+    return get_store().daily_counts(username, start_date, end_date)
+
+# Get the share of tasks completed between two dates (0.0 when there are none)
+def get_completion_ratio(start_date, end_date, username):
+    completed, total = get_store().completion_ratio(username, start_date, end_date)
+    return completed / total if total else 0.0
 
-# Mark a task as completed
+# Get completion rates, streaks and a year heatmap for a user
+def get_task_stats(username, today=None):
+    return get_store().stats_summary(username, today or datetime.date.today())
+
+# Mark a task as completed by its position in get_tasks(date, username)
 def complete_task(date, index, username):
-    tasks = load_tasks()
-    filtered = [t for t in tasks if t["username"] == username and t["date"] == date]
-    if 0 <= index < len(filtered):
-        task_to_complete = filtered[index]
-        for t in tasks:
-            if (
-                t["username"] == task_to_complete["username"] and
-                t["date"] == task_to_complete["date"] and
-                t["task"] == task_to_complete["task"]
-            ):
-                t["completed"] = True
-                break
-        save_tasks(tasks)
+    tasks = get_tasks(date, username)
+    if 0 <= index < len(tasks):
+        complete_task_by_id(tasks[index]["id"], username)
+
+# Mark a task as completed by its ID
+def complete_task_by_id(task_id, username):
+    return get_store().complete(task_id, username)
+
+# Edit a task's text, date or completion flag by its ID
+def update_task(task_id, username, **fields):
+    return get_store().update(task_id, username, **fields)
+
+# Delete a task by its ID
+def delete_task(task_id, username):
+    return get_store().delete(task_id, username)
 
 # Get a random motivational quote
 def get_motivation():
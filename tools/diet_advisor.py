@@ -1,7 +1,9 @@
 import datetime
 import streamlit as st
+from tools.llm_cache import cached_predict
+from tools.llm_streaming import format_timings, stream_llm
 
-def diet_suggestion(llm):
+def diet_suggestion(llm, stream=False):
     st.header("🥗 Personalized Diet Checker & Suggestion")
 
     current_hour = datetime.datetime.now().hour
@@ -42,9 +44,13 @@ Here are the user's meals:
 Now generate a markdown-styled diet feedback.
 """
 
-            # Get response
-            feedback_result = llm.invoke(diet_prompt)
-            feedback_text = getattr(feedback_result, "content", str(feedback_result))
-
             st.success("🍽️ Here's your personalized diet feedback:")
-            st.markdown(feedback_text, unsafe_allow_html=True)  # 👈 now markdown is rendered properly
+            if stream:
+                # Render tokens as they arrive instead of waiting for the full report
+                timings = {}
+                st.write_stream(stream_llm(llm, diet_prompt, timings))
+                st.caption(format_timings(timings))
+            else:
+                # Get response (identical meals reuse the cached feedback)
+                feedback_text = cached_predict(llm, diet_prompt)
+                st.markdown(feedback_text, unsafe_allow_html=True)  # 👈 now markdown is rendered properly
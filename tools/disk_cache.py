@@ -0,0 +1,93 @@
+# tools/disk_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class DiskCache:
+    """Small key -> JSON value cache in a SQLite file, shared across processes.
+
+    Entries expire ``ttl`` seconds after they are written. Once the file holds
+    more than ``max_entries`` rows, the least recently used ones are dropped.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        key        TEXT PRIMARY KEY,
+        value      TEXT NOT NULL,
+        expires_at REAL NOT NULL,
+        used_at    REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS cache_used_at ON cache (used_at);
+    """
+
+    def __init__(self, path, ttl=24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return default
+        with self._conn() as conn:
+            conn.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._writes += 1
+            # Trimming needs a count, so only do it every so often.
+            if self._writes % 100 == 0:
+                self._trim(conn, now)
+
+    def _trim(self, conn, now):
+        conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            "SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def recent(self, limit=50):
+        """Unexpired values, most recently used first."""
+        rows = self._conn().execute(
+            "SELECT value FROM cache WHERE expires_at > ? ORDER BY used_at DESC LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache")
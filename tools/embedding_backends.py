@@ -0,0 +1,197 @@
+# tools/embedding_backends.py
+#
+# Chunk embedding backends for PDF Q&A, picked with EMBEDDING_BACKEND:
+#   torch      the sentence-transformers model in full precision (default)
+#   onnx-int8  the same model exported to ONNX with int8 weights, run on
+#              onnxruntime with a fixed thread count and length-sorted batches
+#
+# The ONNX export is made on first use and kept under .cache/onnx/<model>/, so
+# only one process pays for it. Each backend has its own name, so its vectors
+# never mix with the other's in the embedding cache or the index cache.
+#
+#   python -m tools.embedding_backends   # export ahead of time, e.g. in a Docker build
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from tools.pdf_index import EMBEDDING_MODEL
+from tools.file_lock import InterProcessLock
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(".cache", "onnx"))
+# Hub id or local directory the ONNX model is exported from
+ONNX_SOURCE_MODEL = os.getenv("ONNX_SOURCE_MODEL", f"sentence-transformers/{EMBEDDING_MODEL}")
+ONNX_EMBED_BATCH_SIZE = int(os.getenv("ONNX_EMBED_BATCH_SIZE", "16"))
+ONNX_EMBED_THREADS = int(os.getenv("ONNX_EMBED_THREADS", str(os.cpu_count() or 1)))
+# Same truncation as the sentence-transformers model (max_seq_length)
+ONNX_MAX_LENGTH = int(os.getenv("ONNX_MAX_LENGTH", "256"))
+
+BACKENDS = ("torch", "onnx-int8")
+_QUANTIZED = "model.int8.onnx"
+
+
+def embedding_model_name(backend=None):
+    """Name the backend's vectors are cached under."""
+    backend = backend or EMBEDDING_BACKEND
+    return EMBEDDING_MODEL if backend == "torch" else f"{EMBEDDING_MODEL}-{backend}"
+
+
+# --- Export ---
+
+def _export_kwargs():
+    import inspect
+
+    import torch
+
+    # Newer torch defaults to the dynamo exporter, which needs onnxscript
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        return {"dynamo": False}
+    return {}
+
+
+def _token_model(model, names):
+    """``model`` called with token tensors by keyword, returning only the hidden states."""
+    import torch
+
+    class TokenModel(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *tensors):
+            return self.model(**dict(zip(names, tensors))).last_hidden_state
+
+    return TokenModel().eval()
+
+
+def export_onnx(source=ONNX_SOURCE_MODEL, directory=None):
+    """Export ``source`` to ONNX and quantize its weights to int8 in ``directory``.
+
+    Writes model.onnx (float32), model.int8.onnx and the tokenizer files.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    directory = directory or os.path.join(ONNX_MODEL_DIR, EMBEDDING_MODEL)
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    model = AutoModel.from_pretrained(source).eval()
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    axes = {name: {0: "batch", 1: "tokens"} for name in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "tokens"}
+
+    os.makedirs(os.path.dirname(os.path.abspath(directory)), exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(directory)), prefix=".tmp-")
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                _token_model(model, names),
+                tuple(sample[name] for name in names),
+                os.path.join(tmp, "model.onnx"),
+                input_names=names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=axes,
+                opset_version=14,
+                **_export_kwargs(),
+            )
+        # Dynamic quantization: int8 weights, activations quantized per batch at run time
+        quantize_dynamic(
+            os.path.join(tmp, "model.onnx"), os.path.join(tmp, _QUANTIZED), weight_type=QuantType.QInt8
+        )
+        tokenizer.save_pretrained(tmp)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.rename(tmp, directory)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return directory
+
+
+def ensure_onnx_model(directory=None):
+    """Directory holding the quantized model, exporting it first if needed."""
+    directory = directory or os.path.join(ONNX_MODEL_DIR, EMBEDDING_MODEL)
+    if os.path.exists(os.path.join(directory, _QUANTIZED)):
+        return directory
+    os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+    # Several workers may start cold at once; one exports, the rest wait for it
+    with InterProcessLock(os.path.join(ONNX_MODEL_DIR, "export.lock")):
+        if not os.path.exists(os.path.join(directory, _QUANTIZED)):
+            export_onnx(directory=directory)
+    return directory
+
+
+# --- Inference ---
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence embeddings from the int8 ONNX model: mean pooling, then L2 norm.
+
+    Texts are sorted by length before batching so each batch pads to about
+    the same length, then put back in order.
+    """
+
+    def __init__(self, directory=None, batch_size=None, threads=None, max_length=None):
+        import onnxruntime as ort
+        # The standalone tokenizer, so serving doesn't import transformers (and torch)
+        from tokenizers import Tokenizer
+
+        directory = ensure_onnx_model(directory)
+        self.batch_size = batch_size or ONNX_EMBED_BATCH_SIZE
+        self.tokenizer = Tokenizer.from_file(os.path.join(directory, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length or ONNX_MAX_LENGTH)
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id("[PAD]") or 0)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or ONNX_EMBED_THREADS
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            os.path.join(directory, _QUANTIZED), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def _encode(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        tokens = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {name: tokens[name] for name in self.input_names})[0]
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_documents(self, texts):
+        texts = list(texts)
+        vectors = np.empty((len(texts), 0), dtype=np.float32)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encoded = self._encode([texts[i] for i in batch])
+            if vectors.shape[1] == 0:
+                vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+            vectors[batch] = encoded
+        return vectors.tolist()
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def load_embeddings(backend=None, batch_size=None, threads=None):
+    """The raw (uncached) embedding model for ``backend``."""
+    backend = backend or EMBEDDING_BACKEND
+    if backend == "torch":
+        from langchain.embeddings import HuggingFaceEmbeddings
+        encode_kwargs = {"batch_size": batch_size} if batch_size else {}
+        return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL, encode_kwargs=encode_kwargs)
+    if backend == "onnx-int8":
+        return OnnxEmbeddings(batch_size=batch_size, threads=threads)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+if __name__ == "__main__":
+    print(f"✅ Quantized model ready in {ensure_onnx_model()}")
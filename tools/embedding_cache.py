@@ -0,0 +1,247 @@
+# tools/embedding_cache.py
+#
+# Chunk embeddings cached by (model, sha256 of the chunk text), so re-uploaded
+# or overlapping documents only pay for chunks that were never seen before.
+#
+# Each model has a directory under .cache/embeddings/ holding
+#   vectors.<generation>.f32  float32 rows, only ever appended to and read via mmap
+#   index.db                  SQLite: chunk hash -> row, last use time, settings
+#   store.lock                cross-process lock taken by writers
+# When the vector file outgrows EMBED_CACHE_MAX_MB, the most recently used rows
+# are copied into a new generation and the rest are dropped (LRU).
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from tools.file_lock import InterProcessLock
+
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", os.path.join(".cache", "embeddings"))
+EMBED_CACHE_MAX_MB = float(os.getenv("EMBED_CACHE_MAX_MB", "512"))
+# Share of the limit kept by an eviction pass, so evictions don't run on every write
+EMBED_CACHE_KEEP = float(os.getenv("EMBED_CACHE_KEEP", "0.75"))
+
+_SQL_BATCH = 500
+
+
+def chunk_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only, memory-mapped float32 vectors addressed by chunk hash."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        key     TEXT PRIMARY KEY,
+        row     INTEGER NOT NULL,
+        used_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+    CREATE TABLE IF NOT EXISTS meta (
+        name  TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        self.directory = directory
+        self.max_bytes = int(max_bytes or EMBED_CACHE_MAX_MB * 2 ** 20)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = InterProcessLock(os.path.join(directory, "store.lock"))
+        self._local = threading.local()
+        self._map = None  # (generation, memmap)
+        self._map_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(os.path.join(self.directory, "index.db"), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, conn):
+        meta = dict(conn.execute("SELECT name, value FROM meta").fetchall())
+        return int(meta.get("generation", 0)), int(meta["dim"]) if "dim" in meta else None
+
+    def _vectors_path(self, generation):
+        return os.path.join(self.directory, f"vectors.{generation}.f32")
+
+    def _rows(self, generation, dim, needed):
+        """Read-only mmap of the generation's file, remapped when it has grown past ``needed``."""
+        with self._map_lock:
+            if self._map is None or self._map[0] != generation or len(self._map[1]) <= needed:
+                path = self._vectors_path(generation)
+                rows = os.path.getsize(path) // (dim * 4)
+                self._map = (generation, np.memmap(path, dtype=np.float32, mode="r", shape=(rows, dim)))
+            return self._map[1]
+
+    def get_many(self, keys):
+        """``{key: vector}`` for the keys that are cached; marks them as recently used."""
+        keys = list(keys)
+        found = {}
+        conn = self._conn()
+        # One read transaction, so a concurrent eviction can't move rows under us
+        conn.execute("BEGIN")
+        try:
+            generation, dim = self._meta(conn)
+            rows = {}
+            if dim is not None:
+                for i in range(0, len(keys), _SQL_BATCH):
+                    batch = keys[i:i + _SQL_BATCH]
+                    marks = ",".join("?" * len(batch))
+                    rows.update(conn.execute(f"SELECT key, row FROM entries WHERE key IN ({marks})", batch).fetchall())
+        finally:
+            conn.execute("COMMIT")
+        if rows:
+            vectors = self._rows(generation, dim, max(rows.values()))
+            for key, row in rows.items():
+                found[key] = np.array(vectors[row])
+            now = time.time()
+            with conn:
+                conn.executemany("UPDATE entries SET used_at = ? WHERE key = ?", [(now, key) for key in rows])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """Append ``{key: vector}`` entries that aren't stored yet, then evict if over the limit."""
+        if not items:
+            return
+        with self._lock:
+            conn = self._conn()
+            generation, dim = self._meta(conn)
+            if dim is None:
+                dim = len(next(iter(items.values())))
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dim', ?)", (str(dim),))
+                    conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('generation', ?)", (str(generation),))
+            existing = set(self.get_keys(items.keys()))
+            new = [(key, vector) for key, vector in items.items() if key not in existing]
+            if not new:
+                return
+            path = self._vectors_path(generation)
+            with open(path, "ab") as f:
+                size = f.seek(0, os.SEEK_END)
+                # A crash mid-append can leave a partial row at the end; cut it off so
+                # new rows start on a row boundary (it was never indexed).
+                if size % (dim * 4):
+                    size -= size % (dim * 4)
+                    f.truncate(size)
+                first_row = size // (dim * 4)
+                f.write(np.asarray([vector for _, vector in new], dtype=np.float32).tobytes())
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, row, used_at) VALUES (?, ?, ?)",
+                    [(key, first_row + i, now) for i, (key, _) in enumerate(new)],
+                )
+            if os.path.getsize(path) > self.max_bytes:
+                self._evict(conn, generation, dim)
+
+    def get_keys(self, keys):
+        keys = list(keys)
+        conn = self._conn()
+        present = []
+        for i in range(0, len(keys), _SQL_BATCH):
+            batch = keys[i:i + _SQL_BATCH]
+            marks = ",".join("?" * len(batch))
+            present.extend(key for (key,) in conn.execute(f"SELECT key FROM entries WHERE key IN ({marks})", batch))
+        return present
+
+    def _evict(self, conn, generation, dim):
+        # Called with the store lock held.
+        keep = int(self.max_bytes * EMBED_CACHE_KEEP) // (dim * 4)
+        survivors = conn.execute(
+            "SELECT key, row, used_at FROM entries ORDER BY used_at DESC LIMIT ?", (keep,)
+        ).fetchall()
+        old = np.memmap(self._vectors_path(generation), dtype=np.float32, mode="r")
+        old = old[: len(old) // dim * dim].reshape(-1, dim)
+        new_generation = generation + 1
+        tmp = self._vectors_path(new_generation) + ".tmp"
+        with open(tmp, "wb") as f:
+            for start in range(0, len(survivors), 4096):
+                batch = survivors[start:start + 4096]
+                f.write(np.ascontiguousarray(old[[row for _, row, _ in batch]]).tobytes())
+        os.replace(tmp, self._vectors_path(new_generation))
+        with conn:
+            conn.execute("DELETE FROM entries")
+            conn.executemany(
+                "INSERT INTO entries (key, row, used_at) VALUES (?, ?, ?)",
+                [(key, i, used_at) for i, (key, _, used_at) in enumerate(survivors)],
+            )
+            conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('generation', ?)", (str(new_generation),))
+        # Readers may still be mapping the generation just replaced; drop the ones before it.
+        for name in os.listdir(self.directory):
+            match = re.fullmatch(r"vectors\.(\d+)\.f32", name)
+            if match and int(match.group(1)) < generation:
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        conn = self._conn()
+        generation, dim = self._meta(conn)
+        path = self._vectors_path(generation)
+        total = self.hits + self.misses
+        return {
+            "entries": conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            "dim": dim,
+            "generation": generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_embedding_store(model_name):
+    """One store per embedding model, shared by every session in this process."""
+    safe = re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+    with _stores_lock:
+        if safe not in _stores:
+            _stores[safe] = EmbeddingStore(os.path.join(EMBED_CACHE_DIR, safe))
+        return _stores[safe]
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that look chunks up in the model's store and only embed the misses.
+
+    Queries go straight to the wrapped model; they're short and rarely repeat.
+    """
+
+    def __init__(self, embeddings, model_name, store=None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.store = store or get_embedding_store(model_name)
+
+    def embed_documents(self, texts):
+        keys = [chunk_key(text) for text in texts]
+        found = self.store.get_many(set(keys))
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), (np.asarray(v, dtype=np.float32) for v in vectors)))
+            self.store.put_many(computed)
+            found.update(computed)
+        return [found[key].tolist() for key in keys]
+
+    def embed_query(self, text):
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,237 @@
+# tools/fake_providers.py
+#
+# Local stand-ins for Groq, SerpAPI, newsdata.io and the YouTube Data API, so
+# the app can be load-tested offline. Pick which upstreams are faked with
+#
+#   SMARTLIFE_FAKE_PROVIDERS=all            # or e.g. "llm,weather"
+#
+# and shape each one with SMARTLIFE_FAKE_<NAME>, e.g.
+#
+#   SMARTLIFE_FAKE_LLM="median=0.8,sigma=0.5,error_rate=0.01,rate_limit_rate=0.02"
+#
+# Latencies are log-normal around ``median``. Every draw comes from a seeded
+# RNG keyed by the request and how many times it has been seen, so a run
+# replays the same latencies and failures (SMARTLIFE_FAKE_SEED).
+
+import functools
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+
+SMARTLIFE_FAKE_PROVIDERS = os.getenv("SMARTLIFE_FAKE_PROVIDERS", "")
+SMARTLIFE_FAKE_SEED = os.getenv("SMARTLIFE_FAKE_SEED", "42")
+
+# Host each faked HTTP upstream answers for
+FAKE_HOSTS = {
+    "serpapi.com": "weather",
+    "newsdata.io": "news",
+    "www.googleapis.com": "youtube",
+}
+
+DEFAULT_PROFILES = {
+    "llm": {"median": 0.8, "sigma": 0.5, "error_rate": 0.01, "rate_limit_rate": 0.0,
+            "first_token": 0.25, "tokens_per_second": 250},
+    "weather": {"median": 0.3, "sigma": 0.4, "error_rate": 0.01, "rate_limit_rate": 0.0},
+    "news": {"median": 0.4, "sigma": 0.4, "error_rate": 0.01, "rate_limit_rate": 0.0},
+    "youtube": {"median": 0.25, "sigma": 0.3, "error_rate": 0.01, "rate_limit_rate": 0.0},
+}
+
+
+def fake_enabled(name):
+    names = {part.strip().lower() for part in SMARTLIFE_FAKE_PROVIDERS.split(",") if part.strip()}
+    return "all" in names or name in names
+
+
+def load_profile(name):
+    profile = dict(DEFAULT_PROFILES[name])
+    for part in os.getenv(f"SMARTLIFE_FAKE_{name.upper()}", "").split(","):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            profile[key.strip()] = float(value)
+    return profile
+
+
+class FakeUpstream:
+    """Seeded latency and failure draws for one faked upstream."""
+
+    def __init__(self, name, profile=None, seed=SMARTLIFE_FAKE_SEED):
+        self.name = name
+        self.profile = profile or load_profile(name)
+        self.seed = seed
+        self._seen = Counter()
+        self._lock = threading.Lock()
+
+    def rng(self, request):
+        with self._lock:
+            self._seen[request] += 1
+            occurrence = self._seen[request]
+        digest = hashlib.sha256(f"{self.seed}\0{self.name}\0{request}\0{occurrence}".encode()).digest()
+        return random.Random(digest)
+
+    def draw(self, request):
+        """``(latency, outcome, rng)``; outcome is "ok", "error" or "rate_limited"."""
+        rng = self.rng(request)
+        latency = rng.lognormvariate(0, self.profile["sigma"]) * self.profile["median"]
+        roll = rng.random()
+        if roll < self.profile["rate_limit_rate"]:
+            outcome = "rate_limited"
+        elif roll < self.profile["rate_limit_rate"] + self.profile["error_rate"]:
+            outcome = "error"
+        else:
+            outcome = "ok"
+        return latency, outcome, rng
+
+
+_upstreams = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name):
+    with _upstreams_lock:
+        if name not in _upstreams:
+            _upstreams[name] = FakeUpstream(name)
+        return _upstreams[name]
+
+
+# --- HTTP upstreams ---
+
+def _weather_body(params, rng):
+    city = params.get("q", "").replace("weather in ", "")
+    return {
+        "weather_result": {
+            "temperature": rng.randint(18, 38),
+            "description": rng.choice(["clear sky", "light rain", "partly cloudy", "humid"]),
+        },
+        "search_parameters": {"q": params.get("q", ""), "location": city},
+    }
+
+
+def _news_body(params, rng):
+    topics = ["markets", "monsoon", "cricket", "elections", "startups", "space", "health", "railways"]
+    return {"results": [{"title": f"Fake headline about {rng.choice(topics)} #{i + 1}"} for i in range(10)]}
+
+
+def _youtube_body(params, rng):
+    video_id = hashlib.sha256(params.get("q", "").encode()).hexdigest()[:11]
+    return {"items": [{"id": {"videoId": video_id}}]}
+
+
+_BODIES = {"weather": _weather_body, "news": _news_body, "youtube": _youtube_body}
+
+
+def fake_http_name(url):
+    """Name of the fake serving ``url``, or None if it should go to the network."""
+    name = FAKE_HOSTS.get(urlsplit(url).netloc)
+    return name if name and fake_enabled(name) else None
+
+
+def fake_http_response(name, method, url, params=None, timeout=None, **kwargs):
+    """A ``requests.Response`` as the real upstream might send it, after a simulated delay."""
+    params = params or {}
+    latency, outcome, rng = get_upstream(name).draw(json.dumps(params, sort_keys=True, default=str))
+    read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+    if read_timeout is not None and latency > read_timeout:
+        time.sleep(read_timeout)
+        raise requests.exceptions.ReadTimeout(f"fake {name} timed out after {read_timeout}s")
+    time.sleep(latency)
+
+    response = requests.Response()
+    response.url = url
+    response.headers["Content-Type"] = "application/json"
+    if outcome == "rate_limited":
+        response.status_code = 429
+        response._content = b'{"error": "rate limited"}'
+    elif outcome == "error":
+        response.status_code = 503
+        response._content = b'{"error": "unavailable"}'
+    else:
+        response.status_code = 200
+        response._content = json.dumps(_BODIES[name](params, rng)).encode()
+    return response
+
+
+# --- LLM ---
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class FakeUpstreamError(Exception):
+    status_code = 503
+
+
+def _fake_reply(model, prompt, rng):
+    words = prompt.split()
+    topic = " ".join(words[-6:]) if words else "your question"
+    filler = ["Here", "are", "a", "few", "practical", "ideas", "to", "try", "today:", "rest,", "hydrate,",
+              "plan", "your", "next", "step", "and", "keep", "it", "simple."]
+    length = rng.randint(40, 120)
+    body = " ".join(filler[i % len(filler)] for i in range(length))
+    return f"[{model}] About \"{topic}\": {body}"
+
+
+@functools.lru_cache(maxsize=None)
+def _fake_chat_model_class():
+    # Imported here so the HTTP fakes work without langchain installed
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    class FakeChatModel(BaseChatModel):
+        """Chat model with the seeded latency, error and rate-limit profile of ``llm``."""
+
+        model_name: str
+        upstream: Any
+
+        @property
+        def _llm_type(self):
+            return "fake"
+
+        def _draw(self, messages):
+            prompt = "\n".join(str(m.content) for m in messages)
+            latency, outcome, rng = self.upstream.draw(f"{self.model_name}\0{prompt}")
+            return prompt, latency, outcome, rng
+
+        def _fail(self, outcome):
+            if outcome == "rate_limited":
+                raise FakeRateLimitError(f"fake {self.model_name}: rate limit reached (429)")
+            raise FakeUpstreamError(f"fake {self.model_name}: service unavailable (503)")
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            prompt, latency, outcome, rng = self._draw(messages)
+            time.sleep(latency)
+            if outcome != "ok":
+                self._fail(outcome)
+            text = _fake_reply(self.model_name, prompt, rng)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            prompt, latency, outcome, rng = self._draw(messages)
+            profile = self.upstream.profile
+            time.sleep(profile["first_token"] * latency / profile["median"])
+            if outcome != "ok":
+                self._fail(outcome)
+            delay = 1 / profile["tokens_per_second"]
+            for index, word in enumerate(_fake_reply(self.model_name, prompt, rng).split(" ")):
+                if index:
+                    time.sleep(delay)
+                    word = " " + word
+                chunk = ChatGenerationChunk(message=AIMessageChunk(content=word))
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+
+    return FakeChatModel
+
+
+def create_fake_chat_model(model, **kwargs):
+    """Offline stand-in for ``ChatGroq(model=model, ...)``; other arguments are ignored."""
+    return _fake_chat_model_class()(model_name=model, upstream=get_upstream("llm"))
@@ -0,0 +1,81 @@
+# tools/fanout.py
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from tools.weather_tool import WEATHER_UNAVAILABLE
+
+# Threads shared by every fan-out; a source that overruns its timeout keeps
+# its thread until it returns, so leave headroom above sources-per-request.
+FANOUT_WORKERS = int(os.getenv("SMARTLIFE_FANOUT_WORKERS", "32"))
+DEFAULT_TIMEOUT = float(os.getenv("SMARTLIFE_FANOUT_TIMEOUT", "8"))
+# Cities per weather request; each one is a paid SerpAPI call and a pool thread
+MAX_CITIES = int(os.getenv("SMARTLIFE_MAX_CITIES", "5"))
+
+_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="fanout")
+
+
+class SourceResult:
+    """Outcome of one source: its value (or fallback), whether it succeeded, and how long it took."""
+
+    def __init__(self, value, ok, elapsed, error=None):
+        self.value = value
+        self.ok = ok
+        self.elapsed = elapsed
+        self.error = error
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"SourceResult({status}, {self.elapsed:.2f}s)"
+
+
+def _timed(fn, start):
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def fetch_all(sources, timeouts=None, fallbacks=None, default_timeout=DEFAULT_TIMEOUT):
+    """Run every ``name -> callable`` in ``sources`` at once.
+
+    Each source gets its own deadline from ``timeouts`` (seconds). A source
+    that raises or misses its deadline yields ``fallbacks[name]`` instead of
+    holding up the rest. Returns ``{name: SourceResult}``.
+    """
+    timeouts = timeouts or {}
+    fallbacks = fallbacks or {}
+    start = time.perf_counter()
+    futures = {name: _pool.submit(_timed, fn, start) for name, fn in sources.items()}
+
+    results = {}
+    for name, future in futures.items():
+        timeout = timeouts.get(name, default_timeout)
+        try:
+            value, elapsed = future.result(timeout=max(0.0, start + timeout - time.perf_counter()))
+            results[name] = SourceResult(value, True, elapsed)
+        except FutureTimeout:
+            future.cancel()
+            results[name] = SourceResult(fallbacks.get(name), False, timeout, "timed out")
+        except Exception as e:
+            results[name] = SourceResult(fallbacks.get(name), False, time.perf_counter() - start, str(e))
+    return results
+
+
+def fetch_city_updates(cities, get_weather, get_news, weather_timeout=DEFAULT_TIMEOUT, news_timeout=DEFAULT_TIMEOUT):
+    """Weather for each city and the headlines, all fetched in parallel.
+
+    Returns ``({city: weather_text}, news_text, {source: SourceResult})``.
+    Only the first ``MAX_CITIES`` cities are fetched.
+    """
+    cities = list(cities)[:MAX_CITIES]
+    sources = {f"weather:{city}": (lambda c=city: get_weather(c)[0]) for city in cities}
+    sources["news"] = get_news
+    timeouts = {name: weather_timeout for name in sources}
+    timeouts["news"] = news_timeout
+    fallbacks = {name: WEATHER_UNAVAILABLE for name in sources}
+    fallbacks["news"] = "News headlines are currently unavailable."
+
+    results = fetch_all(sources, timeouts, fallbacks)
+    weather = {city: results[f"weather:{city}"].value for city in cities}
+    return weather, results["news"].value, results
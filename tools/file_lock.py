@@ -0,0 +1,65 @@
+# tools/file_lock.py
+#
+# A lock shared by threads and processes, for the on-disk stores that several
+# Streamlit server processes write to (tasks, embeddings, exported models).
+
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class InterProcessLock:
+    """Re-entrant lock that excludes other threads and other processes.
+
+    Threads are serialised with a ``threading.RLock``; processes with an OS file
+    lock (``flock`` on POSIX, ``msvcrt.locking`` on Windows) on ``path``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            return
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:  # LK_LOCK gives up after ten seconds
+                continue
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+                self._lock_file()
+            except BaseException:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
@@ -0,0 +1,187 @@
+# tools/http_client.py
+#
+# One HTTP client for every external API SmartLife calls (SerpAPI, NewsData,
+# YouTube). Connections are kept alive in a shared pool, every request has a
+# connect and read timeout, transient failures are retried with jittered
+# backoff, and each upstream host has a circuit breaker so a dead service
+# fails fast instead of tying up Streamlit worker threads.
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tools.fake_providers import fake_http_name, fake_http_response
+
+# Seconds to open a connection and to wait for the response
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+# Extra attempts after the first, and the base delay doubled on each one
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.3"))
+HTTP_MAX_BACKOFF = float(os.getenv("HTTP_MAX_BACKOFF", "5"))
+# Keep-alive connections kept per host
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+# Consecutive failures that open a host's breaker, and seconds before it is tried again
+BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN = float(os.getenv("HTTP_BREAKER_COOLDOWN", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling a host whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Closed until ``threshold`` failures in a row, then open for ``cooldown`` seconds.
+
+    After the cooldown one trial request is let through (half-open); its
+    outcome closes the breaker again or restarts the cooldown.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+_session = None
+_session_lock = threading.Lock()
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+# Process-wide session, so every tool reuses the same keep-alive connections
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_breaker(host):
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker()
+        return breaker
+
+
+def breaker_states():
+    with _breakers_lock:
+        return {host: breaker.state for host, breaker in _breakers.items()}
+
+
+def reset():
+    """Forget breaker state and close pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+    with _breakers_lock:
+        _breakers.clear()
+
+
+# "Full jitter": a random delay up to the doubled backoff, so retrying clients spread out
+def _backoff_delay(attempt, response=None):
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), HTTP_MAX_BACKOFF)
+    return random.uniform(0, min(HTTP_MAX_BACKOFF, HTTP_BACKOFF * 2 ** attempt))
+
+
+def _send(method, url, timeout, **kwargs):
+    fake = fake_http_name(url)
+    if fake:
+        return fake_http_response(fake, method, url, timeout=timeout, **kwargs)
+    return get_session().request(method, url, timeout=timeout, **kwargs)
+
+
+def request(method, url, timeout=None, retries=None, **kwargs):
+    """Send a request through the shared session; returns the ``requests.Response``.
+
+    Connection errors, timeouts and 429/5xx answers are retried up to
+    ``retries`` times. The last 429/5xx response is returned as-is once retries
+    run out; connection errors are raised. Raises ``CircuitOpenError`` without
+    touching the network while the host's breaker is open.
+    """
+    timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    retries = HTTP_RETRIES if retries is None else retries
+    host = urlsplit(url).netloc
+    breaker = get_breaker(host)
+
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {host}")
+        try:
+            response = _send(method, url, timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            breaker.record_failure()
+            if attempt == retries:
+                raise
+            time.sleep(_backoff_delay(attempt))
+            continue
+        except Exception:
+            # Anything else (a broken body, a bad redirect...) still counts, and
+            # clears a half-open trial so the host isn't refused forever.
+            breaker.record_failure()
+            raise
+
+        if response.status_code not in RETRY_STATUSES:
+            breaker.record_success()
+            return response
+        breaker.record_failure()
+        if attempt == retries:
+            return response
+        time.sleep(_backoff_delay(attempt, response))
+
+
+def get(url, params=None, **kwargs):
+    return request("GET", url, params=params, **kwargs)
@@ -0,0 +1,86 @@
+# tools/llm_cache.py
+
+import hashlib
+import os
+import re
+import threading
+
+from tools.disk_cache import DiskCache
+from tools.ttl_cache import TTLCache
+
+# How long a cached answer is reused, and how many are kept in each tier
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "512"))
+LLM_CACHE_DISK_SIZE = int(os.getenv("LLM_CACHE_DISK_SIZE", "20000"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_responses.db"))
+
+_memory = TTLCache(maxsize=LLM_CACHE_MEMORY_SIZE, ttl=LLM_CACHE_TTL)
+_disk = None
+_disk_lock = threading.Lock()
+_counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+_counters_lock = threading.Lock()
+
+
+def _disk_cache():
+    global _disk
+    if _disk is None:
+        with _disk_lock:
+            if _disk is None:
+                _disk = DiskCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_DISK_SIZE)
+    return _disk
+
+
+def model_name(llm):
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+# "I'm  Tired\n" and "i'm tired" should share one answer
+def normalize_prompt(prompt):
+    return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+
+def cache_key(prompt, model):
+    return hashlib.sha256(f"{model}\0{normalize_prompt(prompt)}".encode()).hexdigest()
+
+
+def _count(name):
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def get_cached(prompt, model):
+    key = cache_key(prompt, model)
+    text = _memory.get(key)
+    if text is not None:
+        _count("memory_hits")
+        return text
+    text = _disk_cache().get(key)
+    if text is not None:
+        _count("disk_hits")
+        _memory.set(key, text)
+        return text
+    _count("misses")
+    return None
+
+
+def set_cached(prompt, model, text):
+    key = cache_key(prompt, model)
+    _memory.set(key, text)
+    _disk_cache().set(key, text)
+
+
+def cached_predict(llm, prompt):
+    """Text of ``llm``'s answer to ``prompt``, reusing an earlier identical answer when there is one."""
+    model = model_name(llm)
+    text = get_cached(prompt, model)
+    if text is None:
+        result = llm.invoke(prompt)
+        text = getattr(result, "content", str(result))
+        set_cached(prompt, model, text)
+    return text
+
+
+def cache_stats():
+    total = sum(_counters.values())
+    hits = _counters["memory_hits"] + _counters["disk_hits"]
+    return {**_counters, "hit_rate": hits / total if total else 0.0, "memory_size": len(_memory)}
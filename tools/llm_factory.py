@@ -0,0 +1,55 @@
+# tools/llm_factory.py
+
+import hashlib
+import threading
+
+from tools.fake_providers import create_fake_chat_model, fake_enabled
+from tools.llm_gateway import GatewayChatModel
+from tools.llm_router import RoutedChatModel, route_models
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _client_key(model, temperature, api_key, params):
+    # Keep the raw key out of the dict key; a digest still tells keys apart.
+    key_digest = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+    return model, temperature, key_digest, tuple(sorted(params.items()))
+
+
+def get_chat_llm(model, api_key=None, temperature=None, **params):
+    """One ``ChatGroq`` per (model, temperature, key, params), shared by every session.
+
+    Streamlit re-runs the whole script on each click; building the client there
+    would set up a new HTTP connection pool every time. The client is wrapped
+    so its calls go through the LLM gateway (see tools/llm_gateway.py).
+    """
+    key = _client_key(model, temperature, api_key, params)
+    llm = _clients.get(key)
+    if llm is None:
+        with _clients_lock:
+            llm = _clients.get(key)
+            if llm is None:
+                kwargs = dict(params)
+                if temperature is not None:
+                    kwargs["temperature"] = temperature
+                if fake_enabled("llm"):
+                    client = create_fake_chat_model(model, **kwargs)
+                else:
+                    from langchain_groq import ChatGroq
+                    client = ChatGroq(api_key=api_key, model=model, **kwargs)
+                llm = GatewayChatModel(llm=client, model_name=model)
+                _clients[key] = llm
+    return llm
+
+
+def get_routed_llm(feature, api_key=None, temperature=None, **params):
+    """Chat model for ``feature`` that hedges and fails over across its route (see tools/llm_router.py)."""
+    key = ("route", feature) + _client_key(None, temperature, api_key, params)
+    llm = _clients.get(key)
+    if llm is None:
+        models = [get_chat_llm(model, api_key, temperature, **params) for model in route_models(feature)]
+        with _clients_lock:
+            llm = _clients.setdefault(key, RoutedChatModel(models=models, model_name=f"route:{feature}"))
+    return llm
+
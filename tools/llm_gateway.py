@@ -0,0 +1,330 @@
+# tools/llm_gateway.py
+#
+# Every Groq call goes through one gateway per process:
+#   * identical requests already in flight share a single upstream call,
+#   * at most LLM_MAX_CONCURRENCY calls run at once, and waiting callers are
+#     served round-robin per user so one busy session can't starve the rest,
+#   * a 429 pauses everyone for a jittered, growing backoff and halves the
+#     concurrency limit, which then climbs back one step per success.
+# gateway_stats() reports queue depth, wait times and how often each path ran.
+
+import contextvars
+import copy
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Retries after a 429, and the backoff range between them (seconds)
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+
+_current_user = contextvars.ContextVar("llm_user", default="")
+
+
+def set_current_user(username):
+    """Name the user whose LLM calls this thread makes, for fair queueing."""
+    _current_user.set(username or "")
+
+
+def is_rate_limited(error):
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or "rate limit" in str(error).lower()
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after", "")
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def request_key(model, messages, stop=None, params=None):
+    payload = json.dumps(
+        [model, [(m.type, m.content) for m in messages], stop, sorted((params or {}).items())],
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _Broadcast:
+    """Chunks of one upstream stream, replayed to every caller that asked for it."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+
+    def push(self, chunk):
+        with self._cond:
+            self.chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.done = True
+            self.error = error
+            self._cond.notify_all()
+
+    def follow(self):
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self.chunks) and not self.done:
+                    self._cond.wait()
+                if index >= len(self.chunks):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                chunk = self.chunks[index]
+            index += 1
+            yield copy.deepcopy(chunk)
+
+
+class LLMGateway:
+    """Concurrency limit with a fair per-user queue, 429 backoff and request coalescing."""
+
+    def __init__(self, max_concurrency=LLM_MAX_CONCURRENCY, retries=LLM_RATE_LIMIT_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_max=LLM_BACKOFF_MAX):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.active = 0
+        self._cond = threading.Condition()
+        self._queues = {}         # user -> deque of tickets waiting for a slot
+        self._rotation = deque()  # users with waiting tickets, served round-robin
+        self._inflight = {}       # request key -> Future or _Broadcast
+        self._backoff = 0.0
+        self._pause_until = 0.0
+        self._waits = deque(maxlen=1000)
+        self.counters = {"calls": 0, "upstream": 0, "coalesced": 0, "rate_limited": 0, "errors": 0}
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+
+    # --- Slots ---
+
+    def _dispatch(self):
+        while self.active < self.limit and self._rotation:
+            user = self._rotation.popleft()
+            queue = self._queues[user]
+            ticket = queue.popleft()
+            if queue:
+                self._rotation.append(user)
+            else:
+                del self._queues[user]
+            ticket["granted"] = True
+            self.active += 1
+            self.queue_depth -= 1
+        self._cond.notify_all()
+
+    def _acquire(self, user):
+        start = time.monotonic()
+        with self._cond:
+            if self.active < self.limit and not self._rotation:
+                self.active += 1
+            else:
+                ticket = {"granted": False}
+                queue = self._queues.setdefault(user, deque())
+                queue.append(ticket)
+                if len(queue) == 1:
+                    self._rotation.append(user)
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+                while not ticket["granted"]:
+                    self._cond.wait()
+            self._waits.append(time.monotonic() - start)
+            delay = self._pause_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _release(self):
+        with self._cond:
+            self.active -= 1
+            self._dispatch()
+
+    # --- Backoff ---
+
+    def _on_success(self):
+        with self._cond:
+            self._backoff = self._backoff / 2 if self._backoff > self.backoff_base else 0.0
+            if self.limit < self.max_concurrency:
+                self.limit += 1
+                self._dispatch()
+
+    def _on_rate_limited(self, error):
+        with self._cond:
+            self.counters["rate_limited"] += 1
+            self._backoff = min(self.backoff_max, max(self.backoff_base, self._backoff * 2))
+            delay = _retry_after(error) or random.uniform(self._backoff / 2, self._backoff)
+            self._pause_until = max(self._pause_until, time.monotonic() + delay)
+            self.limit = max(1, self.limit // 2)
+        time.sleep(max(0.0, self._pause_until - time.monotonic()))
+
+    def _attempt(self, start_call):
+        """``start_call()``, retried on 429 until it gets going. The caller holds a slot.
+
+        For streams ``start_call`` reads up to the first chunk, so a 429
+        before then is still retried; nothing after it is.
+        """
+        for attempt in range(self.retries + 1):
+            with self._cond:
+                self.counters["upstream"] += 1
+            try:
+                result = start_call()
+                self._on_success()
+                return result
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.retries:
+                    with self._cond:
+                        self.counters["errors"] += 1
+                    raise
+                self._on_rate_limited(e)
+
+    def _upstream(self, start_call, user):
+        """``start_call()`` under a slot, retried on 429."""
+        self._acquire(user)
+        try:
+            return self._attempt(start_call)
+        finally:
+            self._release()
+
+    # --- Public API ---
+
+    def call(self, key, fn, user=None):
+        """Result of ``fn()``, shared with any identical call (same ``key``) already running."""
+        user = _current_user.get() if user is None else user
+        with self._cond:
+            self.counters["calls"] += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = self._upstream(fn, user)
+        except BaseException as e:
+            with self._cond:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._cond:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    def stream(self, key, fn, user=None):
+        """Chunks of ``fn()`` (an iterator), shared with any identical stream already running.
+
+        The upstream stream is drained on its own thread, so a caller that
+        stops reading early doesn't cut it short for the others.
+        """
+        user = _current_user.get() if user is None else user
+        with self._cond:
+            self.counters["calls"] += 1
+            broadcast = self._inflight.get(key)
+            if broadcast is None:
+                broadcast = self._inflight[key] = _Broadcast()
+                threading.Thread(
+                    target=self._pump, args=(key, broadcast, fn, user), daemon=True, name="llm-stream"
+                ).start()
+            else:
+                self.counters["coalesced"] += 1
+        return broadcast.follow()
+
+    def _pump(self, key, broadcast, fn, user):
+        error = None
+
+        def start():
+            iterator = iter(fn())
+            first = next(iterator, None)
+            return first, iterator
+
+        # The slot is held until the upstream stream is drained, not just started,
+        # so LLM_MAX_CONCURRENCY bounds streams that are still being read.
+        self._acquire(user)
+        try:
+            first, iterator = self._attempt(start)
+            if first is not None:
+                broadcast.push(copy.deepcopy(first))
+                for chunk in iterator:
+                    broadcast.push(copy.deepcopy(chunk))
+        except Exception as e:
+            error = e
+        finally:
+            self._release()
+            with self._cond:
+                self._inflight.pop(key, None)
+            broadcast.finish(error)
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                **self.counters,
+                "limit": self.limit,
+                "active": self.active,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_wait": sum(waits) / len(waits) if waits else 0.0,
+                "p95_wait": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                "max_wait": waits[-1] if waits else 0.0,
+                "backoff": self._backoff,
+            }
+
+
+_gateway = LLMGateway()
+
+
+def get_gateway():
+    return _gateway
+
+
+def gateway_stats():
+    return _gateway.stats()
+
+
+class GatewayChatModel(BaseChatModel):
+    """Chat model that sends every request for ``llm`` through the shared gateway.
+
+    Chains, memories and streaming helpers use it exactly like the wrapped model.
+    """
+
+    llm: Any
+    model_name: str = ""
+
+    @property
+    def _llm_type(self):
+        return f"gateway-{self.llm._llm_type}"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        key = request_key(self.model_name, messages, stop, kwargs)
+        return _gateway.call(key, lambda: self.llm._generate(messages, stop=stop, **kwargs))
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        key = request_key(self.model_name, messages, stop, kwargs)
+        for chunk in _gateway.stream(key, lambda: self.llm._stream(messages, stop=stop, **kwargs)):
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
@@ -0,0 +1,272 @@
+# tools/llm_router.py
+#
+# Each feature asks for a route (an ordered list of Groq models) instead of a
+# single pinned model. A request goes to the first model; if it hasn't
+# answered within that model's p95 latency it is hedged to the next one, and
+# an error fails over straight away. Whichever answers first wins. Latencies
+# are kept per model in histograms, which set the hedge deadlines, and a model
+# that keeps failing is tried last until it cools down.
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, List
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+LLM_ROUTES = {
+    "chat": os.getenv("LLM_ROUTE_CHAT", "mixtral-8x7b-32768,llama3-70b-8192,llama3-8b-8192"),
+    "pdf": os.getenv("LLM_ROUTE_PDF", "llama3-8b-8192,llama3-70b-8192,mixtral-8x7b-32768"),
+}
+# Hedge deadline bounds, and the deadline used until a model has enough samples
+LLM_HEDGE_MIN = float(os.getenv("LLM_HEDGE_MIN", "0.5"))
+LLM_HEDGE_MAX = float(os.getenv("LLM_HEDGE_MAX", "15"))
+LLM_HEDGE_DEFAULT = float(os.getenv("LLM_HEDGE_DEFAULT", "4"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+# Consecutive errors that send a model to the back of its routes, and for how long
+LLM_MODEL_FAILURES = int(os.getenv("LLM_MODEL_FAILURES", "3"))
+LLM_MODEL_COOLDOWN = float(os.getenv("LLM_MODEL_COOLDOWN", "60"))
+LLM_ROUTER_WORKERS = int(os.getenv("LLM_ROUTER_WORKERS", "64"))
+
+_pool = ThreadPoolExecutor(max_workers=LLM_ROUTER_WORKERS, thread_name_prefix="llm-route")
+
+
+# Attempts run on other threads; copy the caller's context so the gateway
+# still sees who is asking (set_current_user) and queues them fairly.
+def _submit(fn, *args):
+    return _pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def route_models(feature):
+    return [name.strip() for name in LLM_ROUTES[feature].split(",") if name.strip()]
+
+
+class LatencyHistogram:
+    """Latencies in log-spaced buckets from 10 ms to about 2 minutes."""
+
+    EDGES = [0.01 * 1.25 ** i for i in range(43)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self.counts[bisect_left(self.EDGES, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+
+    def quantile(self, q):
+        """Upper edge of the bucket holding the ``q`` quantile, or None when empty."""
+        with self._lock:
+            if not self.count:
+                return None
+            target = q * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return self.EDGES[min(index, len(self.EDGES) - 1)]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+        }
+
+
+class ModelHealth:
+    def __init__(self):
+        self.latency = {"total": LatencyHistogram(), "first_token": LatencyHistogram()}
+        self.errors = 0
+        self.wins = 0
+        self.consecutive_errors = 0
+        self.cooling_until = 0.0
+
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def health(model):
+    with _health_lock:
+        if model not in _health:
+            _health[model] = ModelHealth()
+        return _health[model]
+
+
+def hedge_deadline(model, kind):
+    histogram = health(model).latency[kind]
+    if histogram.count < LLM_HEDGE_MIN_SAMPLES:
+        return LLM_HEDGE_DEFAULT
+    return min(LLM_HEDGE_MAX, max(LLM_HEDGE_MIN, histogram.quantile(LLM_HEDGE_QUANTILE)))
+
+
+def _record_success(model, kind, seconds):
+    state = health(model)
+    state.latency[kind].record(seconds)
+    state.consecutive_errors = 0
+
+
+def _record_error(model):
+    state = health(model)
+    state.errors += 1
+    state.consecutive_errors += 1
+    if state.consecutive_errors >= LLM_MODEL_FAILURES:
+        state.cooling_until = time.monotonic() + LLM_MODEL_COOLDOWN
+
+
+def router_stats():
+    with _health_lock:
+        models = dict(_health)
+    return {
+        model: {
+            "total": state.latency["total"].summary(),
+            "first_token": state.latency["first_token"].summary(),
+            "errors": state.errors,
+            "wins": state.wins,
+            "cooling": state.cooling_until > time.monotonic(),
+        }
+        for model, state in models.items()
+    }
+
+
+class RoutedChatModel(BaseChatModel):
+    """Chat model backed by an ordered list of models, with hedging and failover."""
+
+    models: List[Any]
+    model_name: str = ""
+
+    @property
+    def _llm_type(self):
+        return "routed"
+
+    @property
+    def _identifying_params(self):
+        return {"model_name": self.model_name}
+
+    def _ordered(self):
+        # Configured order, except models cooling down after repeated errors go last
+        now = time.monotonic()
+        return sorted(self.models, key=lambda llm: health(llm.model_name).cooling_until > now)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        candidates = self._ordered()
+        pending = {}
+        error = None
+
+        def attempt(llm):
+            start = time.perf_counter()
+            try:
+                result = llm._generate(messages, stop=stop, **kwargs)
+            except Exception:
+                _record_error(llm.model_name)
+                raise
+            _record_success(llm.model_name, "total", time.perf_counter() - start)
+            return result
+
+        while candidates or pending:
+            if candidates and (not pending or error is not None):
+                llm = candidates.pop(0)
+                pending[_submit(attempt, llm)] = llm
+                error = None
+            # Wait for an answer, hedging to the next model after the newest one's deadline
+            newest = list(pending.values())[-1]
+            timeout = hedge_deadline(newest.model_name, "total") if candidates else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                llm = candidates.pop(0)
+                pending[_submit(attempt, llm)] = llm
+                continue
+            for future in done:
+                llm = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                health(llm.model_name).wins += 1
+                return result
+        raise error
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        candidates = self._ordered()
+        events = queue.Queue()
+        cancelled = set()
+        started = []
+
+        def pump(llm):
+            start = time.perf_counter()
+            first = True
+            try:
+                for chunk in llm._stream(messages, stop=stop, **kwargs):
+                    if id(llm) in cancelled:
+                        return
+                    if first:
+                        _record_success(llm.model_name, "first_token", time.perf_counter() - start)
+                        first = False
+                    events.put((llm, "chunk", chunk))
+            except Exception as e:
+                _record_error(llm.model_name)
+                events.put((llm, "error", e))
+                return
+            if not first:
+                _record_success(llm.model_name, "total", time.perf_counter() - start)
+            events.put((llm, "done", None))
+
+        def launch():
+            llm = candidates.pop(0)
+            started.append(llm)
+            # Own thread, not the pool: a stream holds it for as long as the answer takes
+            threading.Thread(
+                target=contextvars.copy_context().run, args=(pump, llm), daemon=True, name="llm-route-stream"
+            ).start()
+
+        # Race the models to the first chunk, then follow only the winner
+        launch()
+        winner, error, failed = None, None, 0
+        while winner is None:
+            timeout = hedge_deadline(started[-1].model_name, "first_token") if candidates else None
+            try:
+                llm, kind, payload = events.get(timeout=timeout)
+            except queue.Empty:
+                launch()
+                continue
+            if kind == "chunk":
+                winner = llm
+                cancelled.update(id(other) for other in started if other is not llm)
+                health(llm.model_name).wins += 1
+                first_chunk = payload
+            elif kind == "error" or kind == "done":
+                failed += 1
+                error = payload if kind == "error" else error
+                if candidates:
+                    launch()
+                elif failed == len(started):
+                    if error is not None:
+                        raise error
+                    return
+
+        if run_manager:
+            run_manager.on_llm_new_token(first_chunk.text, chunk=first_chunk)
+        yield first_chunk
+        while True:
+            llm, kind, payload = events.get()
+            if llm is not winner:
+                continue
+            if kind == "done":
+                return
+            if kind == "error":
+                raise payload
+            if run_manager:
+                run_manager.on_llm_new_token(payload.text, chunk=payload)
+            yield payload
@@ -0,0 +1,76 @@
+# tools/llm_streaming.py
+
+import time
+
+from tools.llm_cache import get_cached, model_name, set_cached
+
+
+def _chunk_text(chunk):
+    return getattr(chunk, "content", None) if not isinstance(chunk, str) else chunk
+
+
+def stream_llm(llm, prompt, timings=None, use_cache=True):
+    """Yield the answer to ``prompt`` piece by piece as the model produces it.
+
+    Fills ``timings`` with ``first_token`` and ``total`` seconds. A cached
+    answer comes back as a single piece; a fully streamed one is cached.
+    """
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    model = model_name(llm)
+
+    if use_cache:
+        cached = get_cached(prompt, model)
+        if cached is not None:
+            timings["first_token"] = timings["total"] = time.perf_counter() - start
+            yield cached
+            return
+
+    parts = []
+    for chunk in llm.stream(prompt):
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        if "first_token" not in timings:
+            timings["first_token"] = time.perf_counter() - start
+        parts.append(text)
+        yield text
+    timings["total"] = time.perf_counter() - start
+    timings.setdefault("first_token", timings["total"])
+
+    if use_cache and parts:
+        set_cached(prompt, model, "".join(parts))
+
+
+def stream_conversation(llm, memory, user_input, timings=None):
+    """Stream a reply that sees ``memory``'s history, then record the turn in it.
+
+    The streaming counterpart of ``ConversationChain.predict`` for a memory
+    created with ``return_messages=True``.
+    """
+    from langchain_core.messages import HumanMessage
+
+    messages = list(memory.load_memory_variables({})[memory.memory_key])
+    messages.append(HumanMessage(content=user_input))
+
+    timings = timings if timings is not None else {}
+    start = time.perf_counter()
+    parts = []
+    for chunk in llm.stream(messages):
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        if "first_token" not in timings:
+            timings["first_token"] = time.perf_counter() - start
+        parts.append(text)
+        yield text
+    timings["total"] = time.perf_counter() - start
+    timings.setdefault("first_token", timings["total"])
+
+    memory.save_context({"input": user_input}, {"output": "".join(parts)})
+
+
+def format_timings(timings):
+    if "total" not in timings:
+        return ""
+    return f"⚡ First token in {timings['first_token']:.2f}s · complete in {timings['total']:.2f}s"
@@ -0,0 +1,79 @@
+# tools/migrate_tasks.py
+#
+# Import existing task files into a task store.
+#
+#   python -m tools.migrate_tasks tasks.json data/tasks.json --username Saai
+#   python -m tools.migrate_tasks tasks.json --backend json --target tasks.json
+#
+# Two file layouts are understood:
+#   - tasks.json:      [{"username", "date", "task", "completed"}, ...]
+#   - data/tasks.json: {"2025-07-16": [{"task", "completed"}, ...], ...}
+#     This one has no usernames, so --username says whose tasks they are.
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.task_store import get_task_store
+from tools.task_store_sqlite import get_sqlite_task_store
+
+
+# Yield task dicts from either file layout
+def read_task_file(path, username=None):
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    if isinstance(data, list):
+        for task in data:
+            yield {
+                "id": task.get("id"),
+                "username": task["username"],
+                "date": task["date"],
+                "task": task["task"],
+                "completed": bool(task.get("completed", False)),
+            }
+    elif isinstance(data, dict):
+        if not username:
+            raise ValueError(f"{path} has no usernames; pass --username")
+        for date, tasks in data.items():
+            for task in tasks:
+                yield {
+                    "username": username,
+                    "date": date,
+                    "task": task["task"],
+                    "completed": bool(task.get("completed", False)),
+                }
+    else:
+        raise ValueError(f"{path}: unrecognised task file layout")
+
+
+def migrate(paths, store, username=None):
+    total = 0
+    for path in paths:
+        count = store.add_many(list(read_task_file(path, username)))
+        print(f"✅ Imported {count} tasks from {path}")
+        total += count
+    store.flush()
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import task files into a SmartLife task store.")
+    parser.add_argument("files", nargs="+", help="task files to import")
+    parser.add_argument("--backend", choices=["sqlite", "json"], default="sqlite")
+    parser.add_argument("--target", help="database or snapshot path (default: tasks.db / tasks.json)")
+    parser.add_argument("--username", help="owner of tasks in files without usernames")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        store = get_sqlite_task_store(args.target or "tasks.db")
+    else:
+        store = get_task_store(args.target or "tasks.json")
+    total = migrate(args.files, store, args.username)
+    print(f"📦 {total} tasks imported into {args.target or args.backend}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,12 @@
 import random
 import os
-import requests
+import re
+import threading
 import streamlit as st 
+from tools import http_client
+from tools.disk_cache import DiskCache
+from tools.fake_providers import fake_enabled
+from tools.youtube_quota import SEARCH_COST, DailyQuota
 
 # ✅ Spotify Playlists (fallbacks)
 spotify_playlists = [
@@ -24,9 +29,58 @@ nature_videos = [
     "https://www.youtube.com/watch?v=ZToicYcHIOU",
 ]
 
+# ✅ Query -> video cache and daily quota, shared by every session and process
+YOUTUBE_CACHE_PATH = os.getenv("YOUTUBE_CACHE_PATH", os.path.join(".cache", "youtube.db"))
+YOUTUBE_CACHE_TTL = int(os.getenv("YOUTUBE_CACHE_TTL", str(7 * 24 * 3600)))
+# Queries with no result are remembered for less time
+YOUTUBE_EMPTY_TTL = int(os.getenv("YOUTUBE_EMPTY_TTL", str(24 * 3600)))
+
+_youtube_cache = None
+_youtube_quota = None
+_youtube_lock = threading.Lock()
+
+
+def _youtube_stores():
+    global _youtube_cache, _youtube_quota
+    if _youtube_cache is None:
+        with _youtube_lock:
+            if _youtube_cache is None:
+                _youtube_quota = DailyQuota(YOUTUBE_CACHE_PATH)
+                _youtube_cache = DiskCache(YOUTUBE_CACHE_PATH, ttl=YOUTUBE_CACHE_TTL)
+    return _youtube_cache, _youtube_quota
+
+
+# "Abdul  Kalam Speech!" and "abdul kalam speech" share one search
+def normalize_query(query):
+    return " ".join(re.sub(r"[^\w\s]", " ", query.casefold()).split())
+
+
+def _fallback_video(cache):
+    cached = [url for url in cache.recent() if url]
+    return random.choice(cached or youtube_videos)
+
+
 # ✅ Dynamic YouTube search via API
-def get_youtube_video_by_query(query):
-    api_key = st.secrets["YOUTUBE_API_KEY"]  # ✅ Use st.secrets instead of os.getenv
+def search_youtube(query):
+    """``(url, source)`` for ``query``; source is "cache", "api", "fallback" or "error".
+
+    Repeat queries are answered from the cache. A search is only sent while
+    the daily quota has room; otherwise a cached or static video is returned
+    ("fallback"). The same stand-in is used when the search itself fails
+    ("error"). ``url`` is None when the API found nothing.
+    """
+    cache, quota = _youtube_stores()
+    key = normalize_query(query)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached or None, "cache"
+
+    if not quota.try_spend(SEARCH_COST):
+        print("⚠️ YouTube quota nearly used up, using a fallback video")
+        return _fallback_video(cache), "fallback"
+
+    # The fake provider answers without a key, so none is needed offline
+    api_key = "fake" if fake_enabled("youtube") else st.secrets["YOUTUBE_API_KEY"]
     print(f"🔍 Searching YouTube for: {query}")
     search_url = "https://www.googleapis.com/youtube/v3/search"
     params = {
@@ -38,22 +92,34 @@ def get_youtube_video_by_query(query):
     }
 
     try:
-        res = requests.get(search_url, params=params)
+        res = http_client.get(search_url, params=params)
         print("📦 Response status:", res.status_code)
 
         if res.status_code == 200:
             items = res.json().get("items", [])
             if items:
                 video_id = items[0]["id"]["videoId"]
-                return f"https://www.youtube.com/watch?v={video_id}"
-            else:
-                print("❌ No video items found in response.")
-        else:
-            print(f"❌ Error: Status {res.status_code}")
-        return None
+                url = f"https://www.youtube.com/watch?v={video_id}"
+                cache.set(key, url)
+                return url, "api"
+            print("❌ No video items found in response.")
+            cache.set(key, "", ttl=YOUTUBE_EMPTY_TTL)
+            return None, "api"
+        if res.status_code == 403 and "quotaExceeded" in res.text:
+            quota.exhaust()
+            return _fallback_video(cache), "fallback"
+        print(f"❌ Error: Status {res.status_code}")
     except Exception as e:
         print(f"[❌ YouTube API Exception] {e}")
-        return None
+    return _fallback_video(cache), "error"
+
+
+def get_youtube_video_by_query(query):
+    return search_youtube(query)[0]
+
+
+def youtube_quota_remaining():
+    return _youtube_stores()[1].remaining()
 
 # ✅ Add these functions to avoid import error
 def get_random_spotify_playlist():
@@ -2,14 +2,26 @@
 
 import requests
 import os
+from tools import http_client
+from tools.api_cache import NEWS_CACHE_TTL, cached_source
 from dotenv import load_dotenv
 load_dotenv()
 
-NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 
+# Read per call: Streamlit copies secrets into the environment only once they're loaded
+def _api_key():
+    return os.getenv("NEWS_API_KEY")
+
+
+# Shared across sessions; errors are not cached
+@cached_source("news", NEWS_CACHE_TTL, should_cache=lambda text: not text.startswith("Couldn't"))
 def get_top_news():
-    url = f"https://newsdata.io/api/1/news?apikey={NEWS_API_KEY}&country=in&language=en&category=top"
-    response = requests.get(url)
+    params = {"apikey": _api_key(), "country": "in", "language": "en", "category": "top"}
+    try:
+        response = http_client.get("https://newsdata.io/api/1/news", params=params)
+    except requests.RequestException as e:
+        print(f"[❌ News API error] {e}")
+        return "Couldn't fetch news headlines right now."
     if response.status_code == 200:
         articles = response.json().get("results", [])[:5]
         if not articles:
@@ -0,0 +1,149 @@
+# tools/pdf_extract.py
+#
+# Page-by-page PDF text extraction. iter_pages() yields one PageText per page,
+# in file and page order, while a process pool extracts batches of pages on
+# every core. Only a bounded number of batches is in flight at a time, so
+# memory stays flat however large the upload is.
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+# Pages handed to a worker at once, and batches queued per worker
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+PDF_TASKS_PER_WORKER = int(os.getenv("PDF_TASKS_PER_WORKER", "2"))
+# Below this many pages the pool costs more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+
+
+class PageText(NamedTuple):
+    file: str
+    page_no: int  # 1-based
+    text: str
+
+
+# --- Worker side ---
+
+_reader = None  # (path, PdfReader) of the file this worker read last
+
+
+def _open(path):
+    global _reader
+    if _reader is None or _reader[0] != path:
+        from PyPDF2 import PdfReader
+        _reader = (path, PdfReader(path))
+    return _reader[1]
+
+
+def _extract_range(path, start, stop):
+    reader = _open(path)
+    texts = []
+    for index in range(start, stop):
+        try:
+            texts.append(reader.pages[index].extract_text() or "")
+        except Exception:
+            texts.append("")  # one broken page shouldn't lose the rest of the file
+    return texts
+
+
+# --- Pool ---
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+# "spawn" so workers never inherit the Streamlit server's threads and sockets
+def get_pool(workers):
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return pool
+
+
+def shutdown_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(cancel_futures=True)
+        _pools.clear()
+
+
+# --- Producer side ---
+
+def _file_name(source):
+    return source if isinstance(source, str) else getattr(source, "name", "document.pdf")
+
+
+def _as_path(source, tmp_dir):
+    """A path on disk for ``source`` (a path, or an uploaded file-like object)."""
+    if isinstance(source, str):
+        return source
+    path = os.path.join(tmp_dir, f"{len(os.listdir(tmp_dir))}.pdf")
+    with open(path, "wb") as f:
+        if hasattr(source, "getbuffer"):
+            f.write(source.getbuffer())
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, f)
+    return path
+
+
+def _page_count(path):
+    from PyPDF2 import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def iter_pages(sources, workers=None, pages_per_task=PDF_PAGES_PER_TASK, on_error=None):
+    """Yield ``PageText(file, page_no, text)`` for every page of every PDF in ``sources``.
+
+    ``sources`` are paths or uploaded file objects. Pages come back in order.
+    A file that can't be opened is skipped after calling ``on_error(name, error)``.
+    """
+    workers = workers or PDF_EXTRACT_WORKERS
+    tmp_dir = tempfile.mkdtemp(prefix="smartlife-pdf-")
+    try:
+        jobs = []  # (name, path, start, stop)
+        for source in sources:
+            name = _file_name(source)
+            try:
+                path = _as_path(source, tmp_dir)
+                count = _page_count(path)
+            except Exception as e:
+                if on_error:
+                    on_error(name, e)
+                continue
+            for start in range(0, count, pages_per_task):
+                jobs.append((name, path, start, min(start + pages_per_task, count)))
+
+        total_pages = sum(stop - start for _, _, start, stop in jobs)
+        if workers <= 1 or total_pages < PDF_PARALLEL_MIN_PAGES:
+            for name, path, start, stop in jobs:
+                for offset, text in enumerate(_extract_range(path, start, stop)):
+                    yield PageText(name, start + offset + 1, text)
+            return
+
+        pool = get_pool(workers)
+        pending = deque()
+        jobs = iter(jobs)
+        for job in jobs:
+            pending.append((job, pool.submit(_extract_range, *job[1:])))
+            if len(pending) >= workers * PDF_TASKS_PER_WORKER:
+                break
+        while pending:
+            (name, path, start, stop), future = pending.popleft()
+            texts = future.result()
+            job = next(jobs, None)
+            if job is not None:
+                pending.append((job, pool.submit(_extract_range, *job[1:])))
+            for offset, text in enumerate(texts):
+                yield PageText(name, start + offset + 1, text)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,180 @@
+# tools/pdf_index.py
+#
+# FAISS indexes for PDF Q&A, cached on disk under a key derived from the PDF
+# bytes (plus the embedding model and chunking settings). The same documents
+# are split and embedded once; afterwards the index is memory-mapped from
+# .cache/pdf_indexes/<key>/ and shared by every session and process.
+#
+# Each uploaded file gets its own index and MergedRetriever searches them all,
+# so adding a file only indexes that file and removing one just drops it.
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from typing import Any, List
+
+from langchain_core.retrievers import BaseRetriever
+
+from tools.pdf_extract import iter_pages
+from tools.ttl_cache import TTLCache
+
+PDF_INDEX_DIR = os.getenv("PDF_INDEX_DIR", os.path.join(".cache", "pdf_indexes"))
+# Loaded indexes kept in this process, and for how long
+PDF_INDEX_MEMORY = int(os.getenv("PDF_INDEX_MEMORY", "64"))
+PDF_INDEX_MEMORY_TTL = int(os.getenv("PDF_INDEX_MEMORY_TTL", "3600"))
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 150
+# Bump when the way chunks or indexes are built changes, so old entries are ignored
+INDEX_VERSION = 2
+
+_loaded = TTLCache(maxsize=PDF_INDEX_MEMORY, ttl=PDF_INDEX_MEMORY_TTL)
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def index_key(file_digests, model=EMBEDDING_MODEL):
+    """Cache key for an index over files with these digests, in upload order."""
+    payload = json.dumps([INDEX_VERSION, model, CHUNK_SIZE, CHUNK_OVERLAP, list(file_digests)])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def index_path(key):
+    return os.path.join(PDF_INDEX_DIR, key)
+
+
+def save_index(vectorstore, key):
+    """Write ``vectorstore`` under ``key``; the directory appears complete or not at all."""
+    os.makedirs(PDF_INDEX_DIR, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=PDF_INDEX_DIR, prefix=".tmp-")
+    try:
+        vectorstore.save_local(tmp)
+        os.rename(tmp, index_path(key))
+    except OSError:
+        # Another process saved the same index first; theirs is identical.
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _read_faiss(path):
+    import faiss
+
+    try:
+        return faiss.read_index(path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        # Index types this faiss build can't map are read into memory instead.
+        return faiss.read_index(path)
+
+
+def load_index(key, embeddings):
+    """The saved index for ``key`` with its vectors memory-mapped, or None."""
+    from langchain_community.vectorstores import FAISS
+
+    path = index_path(key)
+    if not os.path.exists(os.path.join(path, "index.faiss")):
+        return None
+    index = _read_faiss(os.path.join(path, "index.faiss"))
+    # Written by save_index() in this process or a sibling, never uploaded.
+    with open(os.path.join(path, "index.pkl"), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    return FAISS(embeddings, index, docstore, index_to_docstore_id)
+
+
+def _build_lock(key):
+    with _build_locks_lock:
+        return _build_locks.setdefault(key, threading.Lock())
+
+
+def get_or_build_index(key, embeddings, build):
+    """Index for ``key`` from memory, then disk, else ``build()`` it and save it.
+
+    ``build()`` returns a FAISS vector store, or None if there is nothing to
+    index; None is returned as-is and not cached. Concurrent sessions asking
+    for the same key wait for one build.
+    """
+    vectorstore = _loaded.get(key)
+    if vectorstore is not None:
+        return vectorstore
+    with _build_lock(key):
+        vectorstore = _loaded.get(key) or load_index(key, embeddings)
+        if vectorstore is None:
+            vectorstore = build()
+            if vectorstore is None:
+                return None
+            save_index(vectorstore, key)
+        _loaded.set(key, vectorstore)
+    with _build_locks_lock:
+        _build_locks.pop(key, None)
+    return vectorstore
+
+
+def iter_documents(files, on_error=None):
+    """Chunks of every page as Documents tagged with their file and page number.
+
+    Pages are extracted in parallel (tools/pdf_extract.py) and split as they arrive.
+    """
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_core.documents import Document
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    for page in iter_pages(files, on_error=on_error):
+        if page.text.strip():
+            for chunk in splitter.split_text(page.text):
+                yield Document(page_content=chunk, metadata={"source": page.file, "page": page.page_no})
+
+
+def build_vectorstore(files, embeddings, on_error=None):
+    """A new FAISS index over ``files``, or None if they hold no text."""
+    from langchain_community.vectorstores import FAISS
+
+    docs = list(iter_documents(files, on_error))
+    if not docs:
+        return None
+    # ✅ FAISS doesn't need external clients or directories
+    return FAISS.from_documents(docs, embedding=embeddings)
+
+
+def get_file_indexes(files, embeddings, build_one):
+    """``[(digest, vectorstore)]`` for the files that have text, one index per file.
+
+    ``build_one(file)`` builds a file's index on a cache miss; files already
+    indexed (by anyone, at any time, with the same embedding model) are loaded instead.
+    """
+    indexes = []
+    for file in files:
+        digest = file_digest(file.getvalue())
+        key = index_key([digest], getattr(embeddings, "model_name", EMBEDDING_MODEL))
+        vectorstore = get_or_build_index(key, embeddings, lambda: build_one(file))
+        if vectorstore is not None:
+            indexes.append((digest, vectorstore))
+    return indexes
+
+
+class MergedRetriever(BaseRetriever):
+    """Nearest chunks across several per-file FAISS indexes, as if they were one.
+
+    The query is embedded once; each index returns its best ``k`` and the
+    overall best ``k`` by distance are kept. ``indexes`` can be swapped at any
+    time to follow the uploaded files.
+    """
+
+    embeddings: Any
+    indexes: List[Any] = []
+    k: int = 4
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        if not self.indexes:
+            return []
+        vector = self.embeddings.embed_query(query)
+        scored = []
+        for _, vectorstore in self.indexes:
+            scored.extend(vectorstore.similarity_search_with_score_by_vector(vector, k=self.k))
+        scored.sort(key=lambda pair: pair[1])
+        return [doc for doc, _ in scored[: self.k]]
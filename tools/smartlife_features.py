@@ -1,6 +1,9 @@
 import random
 import datetime
 
+from tools.llm_cache import cached_predict
+from tools.llm_streaming import stream_llm
+
 # --- Wellness Tips ---
 WELLNESS_TIPS = [
     "Take 10 deep breaths to reset your mind. 🧘‍♂️",
@@ -42,8 +45,8 @@ def get_voice_assistant_response():
     return f"Here's your SmartLife day plan for {today}: 🧠\n\n- Check today's tasks 🗓️\n- Review any reminders 🔔\n- Stay hydrated and eat healthy 🥗\n- Remember to take mindful breaks 🧘‍♀️\n- Keep going! 💪"
 
 # ✅ ADD THIS AT THE END
-def get_tip_based_on_mood(mood: str, llm):
-    prompt = f"""
+def _mood_prompt(mood: str):
+    return f"""
 You are a friendly AI wellness assistant. A user says they are feeling {mood}.
 Respond with:
 1. A short motivational message.
@@ -52,12 +55,17 @@ Respond with:
 
 Keep the tone empathetic and uplifting.
 """
-    return llm.predict(prompt)
+
+def get_tip_based_on_mood(mood: str, llm):
+    return cached_predict(llm, _mood_prompt(mood))
+
+def stream_tip_based_on_mood(mood: str, llm, timings=None):
+    return stream_llm(llm, _mood_prompt(mood), timings)
 
 # tools/smartlife_features.py
 
-def get_contextual_wellness_response(user_input: str, llm):
-    prompt = f"""
+def _wellness_prompt(user_input: str):
+    return f"""
 You are a kind and emotionally aware wellness assistant.
 
 A user just said: "{user_input}"
@@ -69,5 +77,9 @@ Respond with:
 
 Keep the tone warm, friendly, and personal.
 """
-    return llm.predict(prompt)
 
+def get_contextual_wellness_response(user_input: str, llm):
+    return cached_predict(llm, _wellness_prompt(user_input))
+
+def stream_contextual_wellness_response(user_input: str, llm, timings=None):
+    return stream_llm(llm, _wellness_prompt(user_input), timings)
@@ -0,0 +1,158 @@
+# tools/task_io.py
+#
+# Streaming import/export of task history as NDJSON or CSV.
+#
+#   python -m tools.task_io export backup.ndjson
+#   python -m tools.task_io export saai.csv --username Saai
+#   python -m tools.task_io import planner_export.csv --username Saai
+#
+# Rows are read and written one at a time and imported in batches, so memory
+# stays flat however long the history is.
+
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from tools.calendar_tool import get_store
+
+FIELDS = ["id", "username", "date", "task", "completed"]
+BATCH_SIZE = 1000
+
+
+def _format_of(name):
+    return "csv" if name.lower().endswith(".csv") else "ndjson"
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y", "done", "x")
+    return bool(value)
+
+
+# --- Reading ---
+
+def iter_rows(text_stream, fmt):
+    """Yield raw rows from an NDJSON or CSV text stream (None for a line that isn't JSON)."""
+    if fmt == "csv":
+        yield from csv.DictReader(text_stream)
+    else:
+        for line in text_stream:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    yield None  # import_tasks counts it as skipped
+
+
+def normalize_row(row, username=None):
+    """Turn a raw row into a task dict, or None if it isn't an object with a valid date and text."""
+    if not isinstance(row, dict):
+        return None
+    task = row.get("task") or row.get("title") or ""
+    date = row.get("date") or ""
+    owner = username or row.get("username")
+    if not isinstance(task, str) or not isinstance(date, str) or not isinstance(owner, (str, type(None))):
+        return None
+    task = task.strip()
+    date = date.strip()[:10]
+    try:
+        datetime.date.fromisoformat(date)
+    except ValueError:
+        return None
+    if not task:
+        return None
+    return {
+        "username": owner,
+        "date": date,
+        "task": task,
+        "completed": _as_bool(row.get("completed", False)),
+    }
+
+
+def import_tasks(rows, username=None, batch_size=BATCH_SIZE, progress=None, store=None):
+    """Import rows in batches of ``batch_size``; returns ``(imported, skipped)``.
+
+    ``username`` overrides the owner of every row (the UI imports for the
+    logged-in user only). ``progress(imported, skipped)`` runs after each batch.
+    """
+    store = store or get_store()
+    imported = skipped = 0
+    batch = []
+
+    def commit():
+        nonlocal imported
+        imported += store.add_many(batch)
+        store.flush()
+        batch.clear()
+        if progress:
+            progress(imported, skipped)
+
+    for row in rows:
+        task = normalize_row(row, username)
+        if task is None or not task["username"]:
+            skipped += 1
+            continue
+        batch.append(task)
+        if len(batch) >= batch_size:
+            commit()
+    commit()
+    return imported, skipped
+
+
+# --- Writing ---
+
+def export_lines(fmt, username=None, store=None):
+    """Yield NDJSON or CSV lines for every task (or one user's) in the store."""
+    store = store or get_store()
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for task in store.iter_tasks(username):
+            writer.writerow(task)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for task in store.iter_tasks(username):
+            yield json.dumps({k: task[k] for k in FIELDS}) + "\n"
+
+
+def export_tasks(path, username=None, fmt=None):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for line in export_lines(fmt or _format_of(path), username):
+            f.write(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream SmartLife tasks to or from NDJSON/CSV.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", help="file to read or write; .csv means CSV, anything else NDJSON")
+    parser.add_argument("--username", help="import: owner of every row; export: only this user's tasks")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_tasks(args.path, args.username)
+        print(f"📦 Exported tasks to {args.path}")
+        return
+
+    def report(imported, skipped):
+        print(f"\r⏳ {imported} imported, {skipped} skipped", end="", flush=True)
+
+    with open(args.path, "r", newline="", encoding="utf-8") as f:
+        imported, skipped = import_tasks(
+            iter_rows(f, _format_of(args.path)), args.username, args.batch_size, report
+        )
+    print(f"\n✅ Imported {imported} tasks ({skipped} rows skipped)")
+
+
+if __name__ == "__main__":
+    main()
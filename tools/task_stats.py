@@ -0,0 +1,175 @@
+# tools/task_stats.py
+
+import datetime
+from collections import Counter
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _ordinal(date):
+    return datetime.date.fromisoformat(date).toordinal()
+
+
+class UserStats:
+    """Per-day task counters and streak runs for one user, updated in place.
+
+    A day counts towards a streak once it has at least one completed task.
+    Consecutive such days are kept as runs (start/end maps plus a histogram of
+    run lengths), so marking a day done merges runs in O(1) and the best streak
+    never needs a scan over the whole history.
+    """
+
+    def __init__(self):
+        self.days = {}           # date ordinal -> [total, completed]
+        self._run_end = {}       # run start ordinal -> run end ordinal
+        self._run_start = {}     # run end ordinal -> run start ordinal
+        self._lengths = Counter()
+
+    def change(self, date, total_delta, completed_delta):
+        day = _ordinal(date)
+        counts = self.days.setdefault(day, [0, 0])
+        was_done = counts[1] > 0
+        counts[0] += total_delta
+        counts[1] += completed_delta
+        is_done = counts[1] > 0
+        if counts[0] <= 0:
+            del self.days[day]
+        if is_done and not was_done:
+            self._add_run_day(day)
+        elif was_done and not is_done:
+            self._remove_run_day(day)
+
+    def _is_done(self, day):
+        counts = self.days.get(day)
+        return counts is not None and counts[1] > 0
+
+    def _add_run(self, start, end):
+        self._run_end[start] = end
+        self._run_start[end] = start
+        self._lengths[end - start + 1] += 1
+
+    def _drop_run(self, start):
+        end = self._run_end.pop(start)
+        del self._run_start[end]
+        length = end - start + 1
+        self._lengths[length] -= 1
+        if not self._lengths[length]:
+            del self._lengths[length]
+        return end
+
+    def _add_run_day(self, day):
+        start = end = day
+        if day - 1 in self._run_start:
+            start = self._run_start[day - 1]
+            self._drop_run(start)
+        if day + 1 in self._run_end:
+            end = self._drop_run(day + 1)
+        self._add_run(start, end)
+
+    def _remove_run_day(self, day):
+        start = day
+        while start not in self._run_end:
+            start -= 1
+        end = self._drop_run(start)
+        if start < day:
+            self._add_run(start, day - 1)
+        if day < end:
+            self._add_run(day + 1, end)
+
+    # --- Queries ---
+
+    def current_streak(self, today):
+        """Streak ending today, or yesterday if nothing is done yet today."""
+        day = today.toordinal()
+        if not self._is_done(day):
+            day -= 1
+        if not self._is_done(day):
+            return 0
+        if day in self._run_start:
+            return day - self._run_start[day] + 1
+        # The run carries on into the future (tasks completed ahead of time).
+        start = day
+        while start not in self._run_end:
+            start -= 1
+        return day - start + 1
+
+    def best_streak(self):
+        return max(self._lengths) if self._lengths else 0
+
+    def window(self, today, days):
+        """``(completed, total)`` over the ``days`` days ending today."""
+        end = today.toordinal()
+        completed = total = 0
+        for day in range(end - days + 1, end + 1):
+            counts = self.days.get(day)
+            if counts:
+                total += counts[0]
+                completed += counts[1]
+        return completed, total
+
+    def heatmap(self, today, weeks=53):
+        """Completed tasks per day as 7 weekday rows of ``weeks`` columns, oldest first."""
+        end = today.toordinal()
+        # Start on the Monday ``weeks - 1`` weeks before this week's Monday.
+        start = end - today.weekday() - 7 * (weeks - 1)
+        grid = [[None] * weeks for _ in range(7)]
+        for day in range(start, end + 1):
+            counts = self.days.get(day)
+            week, weekday = divmod(day - start, 7)
+            grid[weekday][week] = counts[1] if counts else 0
+        return grid
+
+
+class TaskStats:
+    """``UserStats`` for every user, fed by a task store as tasks change."""
+
+    def __init__(self):
+        self.users = {}
+
+    def reset(self):
+        self.users = {}
+
+    def change(self, username, date, total_delta, completed_delta):
+        try:
+            stats = self.users.setdefault(username, UserStats())
+            stats.change(date, total_delta, completed_delta)
+        except ValueError:
+            pass  # not an ISO date; such tasks are left out of the stats
+
+    def add(self, task):
+        self.change(task["username"], task["date"], 1, 1 if task["completed"] else 0)
+
+    def remove(self, task):
+        self.change(task["username"], task["date"], -1, -1 if task["completed"] else 0)
+
+
+# Dashboard numbers for one user; every query is bounded by the window size
+def summarize(stats, today):
+    if stats is None:
+        stats = UserStats()
+    today_done, today_total = stats.window(today, 1)
+    month_done, month_total = stats.window(today, 30)
+    grid = stats.heatmap(today)
+
+    weekday_rates = []
+    start = today - datetime.timedelta(days=364)
+    year = {}
+    for day in range(start.toordinal(), today.toordinal() + 1):
+        counts = stats.days.get(day)
+        if counts:
+            weekday = datetime.date.fromordinal(day).weekday()
+            totals = year.setdefault(weekday, [0, 0])
+            totals[0] += counts[0]
+            totals[1] += counts[1]
+    for weekday in range(7):
+        total, completed = year.get(weekday, (0, 0))
+        weekday_rates.append(completed / total if total else 0.0)
+
+    return {
+        "today": (today_done, today_total),
+        "last_30_days": (month_done, month_total),
+        "current_streak": stats.current_streak(today),
+        "best_streak": stats.best_streak(),
+        "weekday_rates": weekday_rates,
+        "heatmap": grid,
+    }
@@ -0,0 +1,448 @@
+# tools/task_store.py
+
+import atexit
+import json
+import os
+import secrets
+import stat
+import tempfile
+import threading
+
+from tools.file_lock import InterProcessLock
+from tools.task_stats import TaskStats, summarize
+
+# Journal records written since the last snapshot before a background compaction
+COMPACT_EVERY = 500
+# How long buffered changes may wait before the write-behind flusher persists them
+FLUSH_INTERVAL = 0.05
+# Buffered changes that force an immediate flush
+MAX_PENDING = 256
+
+# Read once at import: os.umask can only be read by setting it, which isn't thread-safe
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+# Write JSON to a temp file next to path, fsync it, then rename it over path
+def atomic_write_json(path, data, indent=4):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp makes the file 0600; keep the old file's mode, or the usual one for a new file
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Compact random task ID (8 URL-safe characters)
+def new_task_id():
+    return secrets.token_urlsafe(6)
+
+
+def _file_id(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class TaskStore:
+    """In-memory task index backed by a JSON snapshot plus an append-only journal.
+
+    The snapshot keeps the original ``tasks.json`` format (a list of task dicts),
+    so older tooling can still read it. Changes hit the in-memory index right
+    away and are buffered; a write-behind thread appends each burst to
+    ``<snapshot>.journal`` in one write and periodically folds the journal back
+    into the snapshot. Every file change happens under an inter-process lock,
+    and a store picks up what other processes appended before it reads.
+    """
+
+    def __init__(self, snapshot_path, compact_every=COMPACT_EVERY,
+                 flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING):
+        self.snapshot_path = snapshot_path
+        self.journal_path = snapshot_path + ".journal"
+        self.compact_every = compact_every
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+
+        # Lock order: self._io (files) before self._lock (memory), never the reverse.
+        self._io = InterProcessLock(snapshot_path + ".lock")
+        self._lock = threading.RLock()
+        self._by_id = {}   # task id -> task, in insertion order
+        self._by_day = {}  # (username, date) -> {task id: task}, in insertion order
+        self._dates = {}   # username -> set of dates that have tasks
+        self.stats = TaskStats()  # kept in step by _index/_unindex/_update
+
+        self._pending = []        # journal records not flushed yet
+        self._pending_by_id = {}  # task id -> its buffered "add"/"update" record
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._closed = False
+
+        self._snapshot_id = None  # (inode, mtime, size) of the snapshot we loaded
+        self._journal_ino = None  # inode of the journal we are reading
+        self._journal_offset = 0  # bytes of that journal already applied
+        self._journal_records = 0
+
+        with self._io, self._lock:
+            if self._load():
+                # Files written before task IDs existed get theirs persisted right
+                # away, so every process that loads the file sees the same IDs.
+                self._write_snapshot()
+
+    # --- Loading ---
+
+    def _load(self):
+        self._by_id = {}
+        self._by_day = {}
+        self._dates = {}
+        self.stats.reset()
+        self._journal_records = 0
+        self._journal_offset = 0
+        migrated = False
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                for task in json.load(f):
+                    migrated |= "id" not in task
+                    self._index(task)
+        self._snapshot_id = _file_id(self.snapshot_path)
+        journal_id = _file_id(self.journal_path)
+        self._journal_ino = journal_id[0] if journal_id else None
+        self._read_journal()
+        return migrated
+
+    # Apply the complete journal lines past our offset; a half-written last
+    # line is left for the next read.
+    def _read_journal(self):
+        if self._journal_ino is None:
+            return
+        with open(self.journal_path, "rb") as f:
+            f.seek(self._journal_offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+                self._journal_records += 1
+        self._journal_offset += end
+
+    def _is_stale(self):
+        journal_id = _file_id(self.journal_path)
+        journal_ino = journal_id[0] if journal_id else None
+        return (
+            _file_id(self.snapshot_path) != self._snapshot_id
+            or journal_ino != self._journal_ino
+            or (journal_id is not None and journal_id[2] != self._journal_offset)
+        )
+
+    # Catch up with other processes; caller holds self._io and self._lock.
+    def _sync(self):
+        journal_id = _file_id(self.journal_path)
+        journal_ino = journal_id[0] if journal_id else None
+        if _file_id(self.snapshot_path) != self._snapshot_id or journal_ino != self._journal_ino:
+            # Someone compacted or replaced the file: start over from disk.
+            self._load()
+        elif journal_id is not None and journal_id[2] != self._journal_offset:
+            self._read_journal()
+        else:
+            return
+        # Our own unflushed changes are newer than anything just read.
+        for record in self._pending:
+            self._apply(record)
+
+    def _refresh(self):
+        if self._is_stale():
+            with self._io, self._lock:
+                self._sync()
+
+    def _new_id(self):
+        while True:
+            task_id = new_task_id()
+            if task_id not in self._by_id:
+                return task_id
+
+    def _index(self, task):
+        if "id" not in task:
+            task["id"] = self._new_id()
+        self._by_id[task["id"]] = task
+        self._by_day.setdefault((task["username"], task["date"]), {})[task["id"]] = task
+        self._dates.setdefault(task["username"], set()).add(task["date"])
+        self.stats.add(task)
+
+    def _unindex(self, task):
+        self.stats.remove(task)
+        del self._by_id[task["id"]]
+        key = (task["username"], task["date"])
+        bucket = self._by_day[key]
+        del bucket[task["id"]]
+        if not bucket:
+            del self._by_day[key]
+            self._dates[task["username"]].discard(task["date"])
+
+    # Journal replay is idempotent, so records replayed twice after an
+    # interrupted compaction leave the same state behind.
+    def _apply(self, record):
+        op = record["op"]
+        task = self._by_id.get(record.get("id"))
+        if op == "add":
+            if record["task"]["id"] not in self._by_id:
+                self._index(dict(record["task"]))
+        elif op == "update" and task is not None:
+            self._update(task, record["fields"])
+        elif op == "delete" and task is not None:
+            self._unindex(task)
+
+    def _update(self, task, fields):
+        if "date" in fields and fields["date"] != task["date"]:
+            self._unindex(task)
+            task.update(fields)
+            self._index(task)
+        else:
+            self.stats.remove(task)
+            task.update(fields)
+            self.stats.add(task)
+
+    # --- Write-behind buffer ---
+
+    # Queue a journal record, folding it into an earlier buffered record for the
+    # same task where possible (add + complete becomes one completed add).
+    def _buffer(self, record):
+        task_id = record["task"]["id"] if record["op"] == "add" else record["id"]
+        earlier = self._pending_by_id.get(task_id)
+        if record["op"] == "update" and earlier is not None:
+            target = earlier["task"] if earlier["op"] == "add" else earlier["fields"]
+            target.update(record["fields"])
+        elif record["op"] == "delete" and earlier is not None and earlier["op"] == "add":
+            self._pending.remove(earlier)
+            del self._pending_by_id[task_id]
+        else:
+            self._pending.append(record)
+            if record["op"] == "delete":
+                self._pending_by_id.pop(task_id, None)
+            else:
+                self._pending_by_id[task_id] = record
+
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self._journal_records >= self.compact_every:
+                self.compact()
+
+    def flush(self):
+        """Append every buffered change to the journal in a single write."""
+        with self._io:
+            with self._lock:
+                if not self._pending:
+                    return
+                # Read what other processes appended first, so our offset stays
+                # in step with the file we are about to append to.
+                self._sync()
+                pending, self._pending, self._pending_by_id = self._pending, [], {}
+
+            data = "".join(json.dumps(record) + "\n" for record in pending).encode()
+            with open(self.journal_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._lock:
+                self._journal_ino = os.stat(self.journal_path).st_ino
+                self._journal_offset += len(data)
+                self._journal_records += len(pending)
+
+    # --- Compaction ---
+
+    # Caller holds self._io and self._lock.
+    def _write_snapshot(self, tasks=None):
+        atomic_write_json(self.snapshot_path, tasks if tasks is not None else list(self._by_id.values()))
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self._snapshot_id = _file_id(self.snapshot_path)
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot.
+
+        Runs on the flusher thread. Request threads only wait for the in-memory
+        copy; other processes' flushes wait on the file lock during the dump.
+        """
+        with self._io:
+            self.flush()
+            with self._lock:
+                self._sync()
+                tasks = [dict(t) for t in self._by_id.values()]
+            self._write_snapshot(tasks)
+
+    # --- Public API ---
+
+    def add(self, username, date, task):
+        with self._lock:
+            record = {
+                "id": self._new_id(),
+                "username": username,
+                "date": date,
+                "task": task,
+                "completed": False,
+            }
+            self._index(record)
+            self._buffer({"op": "add", "task": dict(record)})
+            return record["id"]
+
+    def get(self, username, date):
+        self._refresh()
+        with self._lock:
+            return [dict(t) for t in self._by_day.get((username, date), {}).values()]
+
+    def get_range(self, username, start, end):
+        """Tasks dated ``start``..``end`` (inclusive ISO dates), ordered by date."""
+        self._refresh()
+        with self._lock:
+            dates = sorted(d for d in self._dates.get(username, ()) if start <= d <= end)
+            return [dict(t) for d in dates for t in self._by_day[(username, d)].values()]
+
+    def daily_counts(self, username, start, end):
+        """``[(date, total, completed), ...]`` for each day in range that has tasks."""
+        self._refresh()
+        with self._lock:
+            dates = sorted(d for d in self._dates.get(username, ()) if start <= d <= end)
+            counts = []
+            for d in dates:
+                bucket = self._by_day[(username, d)].values()
+                counts.append((d, len(bucket), sum(1 for t in bucket if t["completed"])))
+            return counts
+
+    def completion_ratio(self, username, start, end):
+        """``(completed, total)`` over the range."""
+        counts = self.daily_counts(username, start, end)
+        return sum(c[2] for c in counts), sum(c[1] for c in counts)
+
+    def stats_summary(self, username, today):
+        """Completion rates, streaks and heatmap for ``username`` (see ``task_stats.summarize``)."""
+        self._refresh()
+        with self._lock:
+            return summarize(self.stats.users.get(username), today)
+
+    def get_by_id(self, task_id):
+        self._refresh()
+        with self._lock:
+            task = self._by_id.get(task_id)
+            return dict(task) if task is not None else None
+
+    def update(self, task_id, username, **fields):
+        """Change ``task``, ``date`` or ``completed`` on one of ``username``'s tasks."""
+        fields = {k: v for k, v in fields.items() if k in ("task", "date", "completed")}
+        self._refresh()
+        with self._lock:
+            task = self._by_id.get(task_id)
+            if task is None or task["username"] != username:
+                return False
+            self._update(task, fields)
+            self._buffer({"op": "update", "id": task_id, "fields": dict(fields)})
+            return True
+
+    def complete(self, task_id, username):
+        return self.update(task_id, username, completed=True)
+
+    def delete(self, task_id, username):
+        self._refresh()
+        with self._lock:
+            task = self._by_id.get(task_id)
+            if task is None or task["username"] != username:
+                return False
+            self._unindex(task)
+            self._buffer({"op": "delete", "id": task_id})
+            return True
+
+    def add_many(self, tasks):
+        """Insert already-built task dicts in one batch; returns how many were added."""
+        with self._lock:
+            for task in tasks:
+                record = {
+                    "id": task.get("id") or self._new_id(),
+                    "username": task["username"],
+                    "date": task["date"],
+                    "task": task["task"],
+                    "completed": bool(task.get("completed", False)),
+                }
+                if record["id"] in self._by_id:
+                    record["id"] = self._new_id()
+                self._index(record)
+                self._buffer({"op": "add", "task": dict(record)})
+            return len(tasks)
+
+    def iter_tasks(self, username=None, chunk_size=1000):
+        """Yield task copies (all users, or one user by date) without copying the whole store."""
+        self._refresh()
+        with self._lock:
+            if username is None:
+                ids = list(self._by_id)
+            else:
+                ids = [i for d in sorted(self._dates.get(username, ())) for i in self._by_day[(username, d)]]
+        for start in range(0, len(ids), chunk_size):
+            with self._lock:
+                chunk = [dict(self._by_id[i]) for i in ids[start:start + chunk_size] if i in self._by_id]
+            yield from chunk
+
+    def all_tasks(self):
+        self._refresh()
+        with self._lock:
+            return [dict(t) for t in self._by_id.values()]
+
+    def replace_all(self, tasks):
+        """Overwrite every task (used by the legacy ``save_tasks`` entry point)."""
+        with self._io, self._lock:
+            self._pending, self._pending_by_id = [], {}
+            self._by_id = {}
+            self._by_day = {}
+            self._dates = {}
+            self.stats.reset()
+            for task in tasks:
+                self._index(dict(task))
+            self._write_snapshot()
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# One store per snapshot file, shared by every Streamlit session in the process
+def get_task_store(snapshot_path):
+    path = os.path.abspath(snapshot_path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = TaskStore(path)
+        return _stores[path]
+
+
+@atexit.register
+def _flush_all_stores():
+    with _stores_lock:
+        for store in _stores.values():
+            store.flush()
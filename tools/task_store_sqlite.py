@@ -0,0 +1,252 @@
+# tools/task_store_sqlite.py
+
+import os
+import sqlite3
+import threading
+import time
+
+from tools.task_stats import TaskStats, summarize
+from tools.task_store import new_task_id
+
+# Seconds a user's stats are trusted before they are rebuilt from one aggregate
+# query; changes from other processes show up within this window.
+STATS_MAX_AGE = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    seq       INTEGER PRIMARY KEY AUTOINCREMENT,
+    id        TEXT NOT NULL UNIQUE,
+    username  TEXT NOT NULL,
+    date      TEXT NOT NULL,
+    task      TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS tasks_user_date ON tasks (username, date);
+"""
+
+COLUMNS = "id, username, date, task, completed"
+
+
+def _row_to_task(row):
+    return {
+        "id": row[0],
+        "username": row[1],
+        "date": row[2],
+        "task": row[3],
+        "completed": bool(row[4]),
+    }
+
+
+class SqliteTaskStore:
+    """Task store on an embedded SQLite database, indexed on (username, date).
+
+    Same methods as ``TaskStore``. Each thread gets its own connection. WAL mode
+    lets readers and the single writer work side by side across processes.
+    Stats for a user are built from one GROUP BY query on first use and then
+    kept current with the deltas of this process's own writes.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self.stats = TaskStats()
+        self._stats_built = {}  # username -> time its stats were rebuilt
+        self._stats_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql, params=()):
+        return self._conn().execute(sql, params).fetchall()
+
+    # Apply a change to the stats of users whose stats are already built
+    def _stats_change(self, username, date, total_delta, completed_delta):
+        with self._stats_lock:
+            if username in self._stats_built:
+                self.stats.change(username, date, total_delta, completed_delta)
+
+    def _old_row(self, conn, task_id, username):
+        return conn.execute(
+            "SELECT date, completed FROM tasks WHERE id = ? AND username = ?", (task_id, username)
+        ).fetchone()
+
+    # --- Public API ---
+
+    def add(self, username, date, task):
+        with self._conn() as conn:
+            while True:
+                task_id = new_task_id()
+                try:
+                    conn.execute(
+                        "INSERT INTO tasks (id, username, date, task, completed) VALUES (?, ?, ?, ?, 0)",
+                        (task_id, username, date, task),
+                    )
+                    break
+                except sqlite3.IntegrityError:
+                    continue
+        self._stats_change(username, date, 1, 0)
+        return task_id
+
+    def _insert(self, conn, tasks):
+        count = 0
+        for t in tasks:
+            row = (t.get("id") or new_task_id(), t["username"], t["date"], t["task"],
+                   int(bool(t.get("completed", False))))
+            try:
+                conn.execute(f"INSERT INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?)", row)
+            except sqlite3.IntegrityError:
+                # A clashing ID (e.g. the same file imported twice) gets a fresh one.
+                conn.execute(f"INSERT INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?)", (new_task_id(),) + row[1:])
+            self._stats_change(row[1], row[2], 1, row[4])
+            count += 1
+        return count
+
+    def add_many(self, tasks):
+        """Insert already-built task dicts in one transaction; returns how many were added."""
+        with self._conn() as conn:
+            return self._insert(conn, tasks)
+
+    def get(self, username, date):
+        rows = self._query(
+            f"SELECT {COLUMNS} FROM tasks WHERE username = ? AND date = ? ORDER BY seq",
+            (username, date),
+        )
+        return [_row_to_task(r) for r in rows]
+
+    def get_range(self, username, start, end):
+        """Tasks dated ``start``..``end`` (inclusive ISO dates), ordered by date."""
+        rows = self._query(
+            f"SELECT {COLUMNS} FROM tasks WHERE username = ? AND date BETWEEN ? AND ? ORDER BY date, seq",
+            (username, start, end),
+        )
+        return [_row_to_task(r) for r in rows]
+
+    def daily_counts(self, username, start, end):
+        """``[(date, total, completed), ...]`` for each day in range that has tasks."""
+        return self._query(
+            "SELECT date, COUNT(*), SUM(completed) FROM tasks "
+            "WHERE username = ? AND date BETWEEN ? AND ? GROUP BY date ORDER BY date",
+            (username, start, end),
+        )
+
+    def completion_ratio(self, username, start, end):
+        """``(completed, total)`` over the range."""
+        completed, total = self._query(
+            "SELECT COALESCE(SUM(completed), 0), COUNT(*) FROM tasks "
+            "WHERE username = ? AND date BETWEEN ? AND ?",
+            (username, start, end),
+        )[0]
+        return completed, total
+
+    def stats_summary(self, username, today):
+        """Completion rates, streaks and heatmap for ``username`` (see ``task_stats.summarize``)."""
+        with self._stats_lock:
+            built = self._stats_built.get(username)
+            if built is None or time.monotonic() - built > STATS_MAX_AGE:
+                self.stats.users.pop(username, None)
+                rows = self._query(
+                    "SELECT date, COUNT(*), SUM(completed) FROM tasks WHERE username = ? GROUP BY date",
+                    (username,),
+                )
+                for date, total, completed in rows:
+                    self.stats.change(username, date, total, completed)
+                self._stats_built[username] = time.monotonic()
+            return summarize(self.stats.users.get(username), today)
+
+    def get_by_id(self, task_id):
+        rows = self._query(f"SELECT {COLUMNS} FROM tasks WHERE id = ?", (task_id,))
+        return _row_to_task(rows[0]) if rows else None
+
+    def update(self, task_id, username, **fields):
+        """Change ``task``, ``date`` or ``completed`` on one of ``username``'s tasks."""
+        fields = {k: v for k, v in fields.items() if k in ("task", "date", "completed")}
+        if "completed" in fields:
+            fields["completed"] = int(bool(fields["completed"]))
+        if not fields:
+            return self.get_by_id(task_id) is not None
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self._conn() as conn:
+            old = self._old_row(conn, task_id, username)
+            if old is None:
+                return False
+            conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE id = ? AND username = ?",
+                (*fields.values(), task_id, username),
+            )
+        self._stats_change(username, old[0], -1, -old[1])
+        self._stats_change(username, fields.get("date", old[0]), 1, fields.get("completed", old[1]))
+        return True
+
+    def complete(self, task_id, username):
+        return self.update(task_id, username, completed=True)
+
+    def delete(self, task_id, username):
+        with self._conn() as conn:
+            old = self._old_row(conn, task_id, username)
+            if old is None:
+                return False
+            conn.execute("DELETE FROM tasks WHERE id = ? AND username = ?", (task_id, username))
+        self._stats_change(username, old[0], -1, -old[1])
+        return True
+
+    def iter_tasks(self, username=None, chunk_size=1000):
+        """Yield tasks (all users, or one user by date) from a cursor, ``chunk_size`` rows at a time."""
+        # A private connection keeps the cursor valid while the caller writes.
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            if username is None:
+                cur = conn.execute(f"SELECT {COLUMNS} FROM tasks ORDER BY seq")
+            else:
+                cur = conn.execute(
+                    f"SELECT {COLUMNS} FROM tasks WHERE username = ? ORDER BY date, seq", (username,)
+                )
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield _row_to_task(row)
+        finally:
+            conn.close()
+
+    def all_tasks(self):
+        return [_row_to_task(r) for r in self._query(f"SELECT {COLUMNS} FROM tasks ORDER BY seq")]
+
+    def replace_all(self, tasks):
+        """Overwrite every task (used by the legacy ``save_tasks`` entry point)."""
+        with self._stats_lock:
+            self.stats.reset()
+            self._stats_built = {}
+        with self._conn() as conn:
+            conn.execute("DELETE FROM tasks")
+            self._insert(conn, tasks)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+# One store per database file, shared by every Streamlit session in the process
+def get_sqlite_task_store(db_path):
+    path = os.path.abspath(db_path)
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = SqliteTaskStore(path)
+        return _stores[path]
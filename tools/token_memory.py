@@ -0,0 +1,85 @@
+# tools/token_memory.py
+
+import os
+from functools import lru_cache
+
+from langchain.memory import ConversationSummaryBufferMemory
+
+# Token budget for one session's conversation history (recent turns + summary)
+MEMORY_TOKEN_LIMIT = int(os.getenv("SMARTLIFE_MEMORY_TOKEN_LIMIT", "1500"))
+# The rolling summary is cut back to this many tokens if it ever grows past it
+SUMMARY_TOKEN_LIMIT = int(os.getenv("SMARTLIFE_SUMMARY_TOKEN_LIMIT", "300"))
+# Rough per-message overhead of the chat format (role markers etc.)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=4)
+def _encoding(name):
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:  # tiktoken missing or its BPE file can't be fetched
+        print(f"[⚠️ tiktoken unavailable, estimating tokens] {e}")
+        return None
+
+
+def count_tokens(text, encoding_name="cl100k_base"):
+    encoding = _encoding(encoding_name)
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text))
+
+
+class TokenBudgetMemory(ConversationSummaryBufferMemory):
+    """Conversation memory that never sends more than ``max_token_limit`` tokens.
+
+    Recent turns are kept verbatim. When they go over budget, the oldest ones
+    are folded into a rolling LLM-written summary. Tokens are counted locally
+    with tiktoken instead of the model's own (much slower) tokenizer.
+    """
+
+    max_token_limit: int = MEMORY_TOKEN_LIMIT
+    summary_token_limit: int = SUMMARY_TOKEN_LIMIT
+    encoding_name: str = "cl100k_base"
+
+    def count_message_tokens(self, message):
+        return count_tokens(str(message.content), self.encoding_name) + MESSAGE_OVERHEAD_TOKENS
+
+    @property
+    def buffer_tokens(self):
+        return sum(self.count_message_tokens(m) for m in self.chat_memory.messages)
+
+    @property
+    def summary_tokens(self):
+        return count_tokens(self.moving_summary_buffer, self.encoding_name) if self.moving_summary_buffer else 0
+
+    @property
+    def token_budget(self):
+        """Most tokens ``context_tokens`` can reach: recent turns plus summary."""
+        return self.max_token_limit + self.summary_token_limit
+
+    @property
+    def context_tokens(self):
+        """Tokens this memory adds to the next prompt."""
+        return self.buffer_tokens + self.summary_tokens
+
+    def prune(self):
+        buffer = self.chat_memory.messages
+        sizes = [self.count_message_tokens(m) for m in buffer]
+        total = sum(sizes)
+        if total <= self.max_token_limit:
+            return
+
+        pruned = []
+        while buffer and total > self.max_token_limit:
+            pruned.append(buffer.pop(0))
+            total -= sizes.pop(0)
+        self.moving_summary_buffer = self.predict_new_summary(pruned, self.moving_summary_buffer)
+
+        if self.summary_tokens > self.summary_token_limit:
+            encoding = _encoding(self.encoding_name)
+            if encoding is None:
+                self.moving_summary_buffer = self.moving_summary_buffer[-self.summary_token_limit * 4:]
+            else:
+                tokens = encoding.encode(self.moving_summary_buffer)
+                self.moving_summary_buffer = encoding.decode(tokens[-self.summary_token_limit:])
@@ -2,18 +2,33 @@
 
 import requests
 import os
+from tools import http_client
+from tools.api_cache import WEATHER_CACHE_TTL, cached_source
 from dotenv import load_dotenv
 load_dotenv()
 
-SERP_API_KEY = os.getenv("SERP_API_KEY")
+WEATHER_UNAVAILABLE = "Weather update is currently unavailable."
 
+
+# Read per call: Streamlit copies secrets into the environment only once they're loaded.
+# SERPAPI_API_KEY is the name used in secrets.toml.
+def _api_key():
+    return os.getenv("SERP_API_KEY") or os.getenv("SERPAPI_API_KEY")
+
+
+# Shared across sessions; only lookups that produced a weather report are cached
+@cached_source("weather", WEATHER_CACHE_TTL, should_cache=lambda result: result[0] != WEATHER_UNAVAILABLE)
 def get_weather(city):
     params = {
         "engine": "google",
         "q": f"weather in {city}",
-        "api_key": SERP_API_KEY
+        "api_key": _api_key()
     }
-    response = requests.get("https://serpapi.com/search", params=params)
+    try:
+        response = http_client.get("https://serpapi.com/search", params=params)
+    except requests.RequestException as e:
+        print(f"[❌ Weather API error] {e}")
+        return WEATHER_UNAVAILABLE, {}
 
     if response.status_code == 200:
         data = response.json()
@@ -36,6 +51,6 @@ def get_weather(city):
             if "°C" in title or "weather" in title.lower():
                 return f"Weather info (from search): {title}", data
 
-        return "Weather update is currently unavailable.", data
+        return WEATHER_UNAVAILABLE, data
     else:
-        return "Weather update is currently unavailable.", {}
+        return WEATHER_UNAVAILABLE, {}
@@ -0,0 +1,93 @@
+# tools/youtube_quota.py
+#
+# YouTube Data API budget shared by every process on this machine. The API
+# grants a fixed number of units per day (reset at midnight Pacific time) and
+# a search costs 100 of them, so spending is tracked in a SQLite file and
+# searches are refused once only the reserve is left.
+
+import datetime
+import os
+import sqlite3
+import threading
+
+try:
+    from zoneinfo import ZoneInfo
+    _QUOTA_TZ = ZoneInfo("America/Los_Angeles")
+except Exception:  # no tz database on this machine
+    _QUOTA_TZ = datetime.timezone(datetime.timedelta(hours=-8))
+
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+# Units kept back so a burst of searches can't push the key over its limit
+YOUTUBE_QUOTA_RESERVE = int(os.getenv("YOUTUBE_QUOTA_RESERVE", "500"))
+SEARCH_COST = 100
+
+
+def quota_day(now=None):
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.astimezone(_QUOTA_TZ).date().isoformat()
+
+
+class DailyQuota:
+    """Token bucket holding ``daily_units`` tokens, refilled at each quota day boundary.
+
+    ``try_spend`` takes tokens atomically across processes (``BEGIN IMMEDIATE``
+    on the SQLite file) and refuses once fewer than ``reserve`` would remain.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS quota (
+        day   TEXT PRIMARY KEY,
+        spent INTEGER NOT NULL
+    );
+    """
+
+    def __init__(self, path, daily_units=YOUTUBE_DAILY_QUOTA, reserve=YOUTUBE_QUOTA_RESERVE):
+        self.path = path
+        self.daily_units = daily_units
+        self.reserve = reserve
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def spent(self, day=None):
+        row = self._conn().execute("SELECT spent FROM quota WHERE day = ?", (day or quota_day(),)).fetchone()
+        return row[0] if row else 0
+
+    def remaining(self):
+        return max(0, self.daily_units - self.spent())
+
+    def try_spend(self, units):
+        day = quota_day()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT spent FROM quota WHERE day = ?", (day,)).fetchone()
+            spent = row[0] if row else 0
+            if spent + units > self.daily_units - self.reserve:
+                conn.execute("ROLLBACK")
+                return False
+            conn.execute("INSERT OR REPLACE INTO quota (day, spent) VALUES (?, ?)", (day, spent + units))
+            # Earlier days are no longer needed
+            conn.execute("DELETE FROM quota WHERE day < ?", (day,))
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def exhaust(self):
+        """Mark today's quota as used up, e.g. after the API answers ``quotaExceeded``."""
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO quota (day, spent) VALUES (?, ?)", (quota_day(), self.daily_units)
+        )
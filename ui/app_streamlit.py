@@ -5,40 +5,47 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import base64
 
 import streamlit as st
-import requests
-from langchain_groq import ChatGroq
-from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferMemory
+from tools.api_cache import api_cache_stats
+from tools.news_tool import get_top_news
+from tools.weather_tool import get_weather
+from tools.token_memory import TokenBudgetMemory
+from tools.llm_factory import get_routed_llm
 from ui.pdf_chat_module import render_pdf_chat
 from tools.diet_advisor import diet_suggestion
 from dotenv import load_dotenv
 from ui.login_page import login_page
 from ui.signup_page import signup_page
+from db.auth_service import resolve_session, logout
+from tools.llm_gateway import set_current_user
 
 import tempfile
 
 import datetime
-from tools.calendar_tool import add_task, get_tasks, complete_task, get_motivation
+from tools.calendar_tool import add_task, get_tasks, complete_task_by_id, get_motivation, get_task_stats
+from tools.task_stats import WEEKDAYS
+from tools.task_io import import_tasks, iter_rows, export_lines
 from tools.smartlife_features import (
     get_random_wellness_tip,
     get_random_diet_tip,
     get_random_motivational_quote,
     get_voice_assistant_response,
     get_tip_based_on_mood,
-    get_contextual_wellness_response
+    get_contextual_wellness_response,
+    stream_contextual_wellness_response
 )
+from tools.llm_streaming import format_timings, stream_conversation
+from tools.fanout import MAX_CITIES, fetch_city_updates
 from tools.motivation_booster import (
     get_random_spotify_playlist,
     get_random_youtube_video,
     get_random_nature_video,
-    get_youtube_video_by_query
+    search_youtube
 )
 import io
 from tools.smartlife_voice_assistant import run_voice_assistant
 from ui.voice_recorder_component import create_voice_recorder, text_to_speech
 
 import streamlit as st
-from langchain_groq import ChatGroq
 from gtts import gTTS
 import base64  # Make sure this is at the top of your script
 
@@ -50,29 +57,19 @@ def get_image_base64(image_path):
 
 # Get keys from Streamlit secrets (for production)
 # For local development, you can use .env file
+# (the weather and news tools read theirs from the environment, where Streamlit puts secrets)
 try:
-    NEWS_API_KEY = st.secrets["NEWS_API_KEY"]
-    SERP_API_KEY = st.secrets["SERPAPI_API_KEY"]
     groq_api_key = st.secrets["GROQ_API_KEY"]
     print("✅ Using Streamlit secrets for API keys")
 except:
     # Fallback to .env for local development
     load_dotenv()
-    NEWS_API_KEY = os.getenv("NEWS_API_KEY")
-    SERP_API_KEY = os.getenv("SERPAPI_API_KEY")
     groq_api_key = os.getenv("GROQ_API_KEY")
     print("✅ Using .env file for API keys (local development)")
 
-# Initialize LLM with Groq
-llm = ChatGroq(
-    api_key=groq_api_key,
-    model="mixtral-8x7b-32768"
-)
-
-if 'users' not in st.session_state:
-    st.session_state.users = {
-        "Abhirami": "abhiramit09"  # Predefined user for testing
-    }
+# Shared Groq clients for the chat route (built once per process, reused by every
+# session and rerun); slow or failing models are hedged/failed over to the next
+llm = get_routed_llm("chat", api_key=groq_api_key)
 
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -92,44 +89,15 @@ def speak_streamlit(text):
 
 
 # --- News & Weather Functions ---
-def get_weather(city):
-    params = {"engine": "google", "q": f"weather in {city}", "api_key": SERP_API_KEY}
-    response = requests.get("https://serpapi.com/search", params=params)
-    if response.status_code == 200:
-        data = response.json()
-        weather_box = data.get("weather_result", {})
-        temp = weather_box.get("temperature")
-        description = weather_box.get("description")
-        if temp and description:
-            return f"The weather in {city} is {description} with a temperature of {temp}°C.", data
-        snippet = data.get("answer_box", {}).get("snippet")
-        if snippet:
-            return f"Weather info: {snippet}", data
-        for res in data.get("organic_results", []):
-            title = res.get("title", "")
-            if "°C" in title or "weather" in title.lower():
-                return f"Weather info: {title}", data
-        return "Weather update is currently unavailable.", data
-    else:
-        return "Weather update is currently unavailable.", {}
-
-def get_top_news():
-    url = f"https://newsdata.io/api/1/news?apikey={NEWS_API_KEY}&country=in&language=en&category=top"
-    response = requests.get(url)
-    if response.status_code == 200:
-        articles = response.json().get("results", [])[:5]
-        if not articles:
-            return "No news headlines available."
-        return "\n\n".join([f"{i+1}. {a['title']}" for i, a in enumerate(articles)])
-    else:
-        return f"Couldn't fetch news. Status: {response.status_code}"
+# Seconds each source may take before the page goes on without it
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", "6"))
+NEWS_TIMEOUT = float(os.getenv("NEWS_TIMEOUT", "6"))
 
 # --- LLM Setup ---
 if "memory" not in st.session_state:
-    st.session_state.memory = ConversationBufferMemory(return_messages=True)
+    # History is capped at MEMORY_TOKEN_LIMIT tokens; older turns become a summary
+    st.session_state.memory = TokenBudgetMemory(llm=llm, return_messages=True)
 
-# Use the already initialized llm from above
-conversation = ConversationChain(llm=llm, memory=st.session_state.memory, verbose=False)
 import streamlit as st
 
 # Initialize session state variables
@@ -139,90 +107,43 @@ if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
 if "username" not in st.session_state:
     st.session_state.username = ""
+if "auth_token" not in st.session_state:
+    st.session_state.auth_token = None
+# Older builds put the token in ?session=; never trust it, just drop it from the URL
+if "session" in st.query_params:
+    del st.query_params["session"]
+
+# Check the session token on every rerun (served from the auth cache), so a
+# logout or expiry elsewhere ends this session too
+session_user = resolve_session(st.session_state.auth_token)
+if session_user:
+    if not st.session_state.logged_in:
+        st.session_state.logged_in = True
+        st.session_state.username = session_user
+        st.session_state.page = "home"
+elif st.session_state.logged_in:
+    st.session_state.logged_in = False
+    st.session_state.username = ""
+    st.session_state.page = "login"
+# LLM calls made during this rerun queue under this user's name
+set_current_user(st.session_state.username)
 
-# Dummy user store (replace with DB or file system in real app)
-if "users" not in st.session_state:
-    st.session_state.users = {}  # {username: password}
-
-# Login page
-import streamlit as st
-
-def login_page():
-    st.set_page_config(page_title="Login | SmartLife", layout="wide")
-
-    # Two-column layout: left for image, right for login
-    left_col, right_col = st.columns([0.5, 0.6])
-
-    with left_col:
-        st.image("assets/login_logo.jpeg", use_container_width=True)
-
-
-    with right_col:
-        st.markdown("<h1 style='text-align: center;'>🔐 Login</h1>", unsafe_allow_html=True)
-        st.markdown("""
-    <style>
-        .small-input input {
-            width: 200px !important;
-            height: 30px !important;
-            font-size: 14px !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
-
-
-        username = st.text_input("Username")  # No key
-        password = st.text_input("Password", type="password")
-
-        if st.button("Login"):
-            if username in st.session_state.users and st.session_state.users[username] == password:
-                st.session_state.logged_in = True
-                st.session_state.username = username
-                st.session_state.page = "home"
-            else:
-                st.error("Invalid username or password.")
-
-        st.markdown("---")
-        st.text("New user?")
-        if st.button("Go to Sign Up"):
-            st.session_state.page = "signup"
-
-
-# Signup page
-def signup_page():
-    st.set_page_config(page_title="Sign Up | SmartLife", layout="wide")
-
-    # Two-column layout: left for image, right for signup form
-    left_col, right_col = st.columns([0.6, 1])  # 0.5 width each
-
-    with left_col:
-        # Make image fill container
-        st.image("assets/signup.png", use_container_width=True)
-
-    with right_col:
-        st.markdown("<h1 style='text-align: center;'>📝 Sign Up</h1>", unsafe_allow_html=True)
 
-        username = st.text_input("Choose a Username")
-        password = st.text_input("Choose a Password", type="password")
+def logout_user():
+    logout(st.session_state.auth_token)
+    st.session_state.auth_token = None
+    st.session_state.logged_in = False
+    st.session_state.page = "login"
+    st.session_state.username = ""
 
-        if st.button("Create Account"):
-            if username in st.session_state.users:
-                st.error("Username already exists.")
-            else:
-                st.session_state.users[username] = password
-                st.success("Account created successfully!")
-                st.session_state.page = "login"
 
-        if st.button("Back to Login"):
-            st.session_state.page = "login"
 # Home page
 def home_page():
     st.title("🤖 SmartLife – Your AI Companion")
     st.success(f"Welcome, {st.session_state.username}!")
     
     if st.button("Logout"):
-        st.session_state.logged_in = False
-        st.session_state.page = "login"
-        st.session_state.username = ""
+        logout_user()
 
 # Routing logic
 # --- UI Setup ---
@@ -262,7 +183,7 @@ features = [
 query_selected = st.query_params.get("feature")
 if query_selected and query_selected in features:
     st.session_state.selected_feature = query_selected
-    st.query_params.clear()
+    del st.query_params["feature"]
 
 # --- Feature Selection ---
 if "selected_feature" not in st.session_state:
@@ -280,9 +201,7 @@ if feature == "🏠 Home":
     col1, col2, col3 = st.columns([6, 1, 1])
     with col3:
         if st.button("🚪 Logout", type="secondary"):
-            st.session_state.logged_in = False
-            st.session_state.page = "login"
-            st.session_state.username = ""
+            logout_user()
             st.rerun()
 
     # --- Background CSS (inside the if block!)
@@ -387,14 +306,14 @@ elif feature == "🗓️ Task Planner":
         tasks = get_tasks(selected_view_date.isoformat(), st.session_state.username)
 
         if tasks:
-            for idx, task in enumerate(tasks):
+            for task in tasks:
                 task_display = f"{'✅' if task['completed'] else '🕒'} {task['task']}"
                 col_task, col_button = st.columns([0.85, 0.15])
                 with col_task:
                     st.markdown(task_display)
                 with col_button:
-                    if not task['completed'] and st.button("Done", key=f"{selected_view_date}_{idx}"):
-                        complete_task(selected_view_date.isoformat(), idx, st.session_state.username)
+                    if not task['completed'] and st.button("Done", key=f"done_{task['id']}"):
+                        complete_task_by_id(task['id'], st.session_state.username)
                         st.session_state["motivational_quote"] = get_motivation()
                         st.rerun()
         else:
@@ -405,6 +324,76 @@ elif feature == "🗓️ Task Planner":
             st.success(st.session_state["motivational_quote"])
             del st.session_state["motivational_quote"]
 
+        with st.expander("📊 Productivity Stats"):
+            stats = get_task_stats(st.session_state.username)
+            today_done, today_total = stats["today"]
+            month_done, month_total = stats["last_30_days"]
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("Today", f"{today_done}/{today_total}")
+            m2.metric("30-day rate", f"{(month_done / month_total if month_total else 0):.0%}")
+            m3.metric("Current streak", f"{stats['current_streak']} 🔥")
+            m4.metric("Best streak", f"{stats['best_streak']} 🏆")
+
+            st.markdown("**✅ Completed tasks over the last year**")
+            cells = []
+            for weekday, row in enumerate(stats["heatmap"]):
+                cells.append(f'<div style="width: 28px; font-size: 10px;">{WEEKDAYS[weekday]}</div>')
+                for count in row:
+                    if count is None:
+                        color = "transparent"
+                    elif count == 0:
+                        color = "#ebedf0"
+                    else:
+                        color = ["#9be9a8", "#40c463", "#30a14e", "#216e39"][min(count, 4) - 1]
+                    cells.append(f'<div style="width: 9px; height: 9px; background: {color}; border-radius: 2px;"></div>')
+            st.markdown(
+                f"""
+                <div style="display: grid; grid-template-columns: 28px repeat({len(stats['heatmap'][0])}, 9px);
+                            gap: 2px; align-items: center; overflow-x: auto;">
+                    {''.join(cells)}
+                </div>
+                """,
+                unsafe_allow_html=True
+            )
+
+            st.markdown("**📅 Completion rate by weekday**")
+            st.bar_chart({"Completion %": {day: round(rate * 100) for day, rate in zip(WEEKDAYS, stats["weekday_rates"])}})
+
+        with st.expander("📦 Import / Export Tasks"):
+            uploaded_tasks = st.file_uploader("Import tasks from CSV or NDJSON", type=["csv", "ndjson", "jsonl"])
+            st.caption("Columns: date (YYYY-MM-DD), task, completed")
+            if uploaded_tasks is not None and st.button("📥 Import Tasks"):
+                progress_bar = st.progress(0.0, text="Importing tasks...")
+
+                def show_progress(imported, skipped):
+                    fraction = min(uploaded_tasks.tell() / max(uploaded_tasks.size, 1), 1.0)
+                    progress_bar.progress(fraction, text=f"Imported {imported} tasks ({skipped} skipped)")
+
+                fmt = "csv" if uploaded_tasks.name.lower().endswith(".csv") else "ndjson"
+                text_stream = io.TextIOWrapper(uploaded_tasks, encoding="utf-8", newline="")
+                imported, skipped = import_tasks(
+                    iter_rows(text_stream, fmt), st.session_state.username, progress=show_progress
+                )
+                progress_bar.progress(1.0, text="Import finished")
+                st.success(f"✅ Imported {imported} tasks ({skipped} rows skipped).")
+
+            export_format = st.radio("Export format", ["csv", "ndjson"], horizontal=True)
+            # Expander bodies run on every rerun even when collapsed, so the history
+            # is only walked when asked for, not on every "Done" click.
+            if st.button("📦 Prepare Export"):
+                st.session_state.task_export = (
+                    export_format, "".join(export_lines(export_format, st.session_state.username))
+                )
+            prepared = st.session_state.get("task_export")
+            if prepared is not None and prepared[0] == export_format:
+                st.download_button(
+                    "📤 Export My Tasks",
+                    data=prepared[1],
+                    file_name=f"smartlife_tasks.{export_format}",
+                    mime="text/csv" if export_format == "csv" else "application/x-ndjson",
+                    on_click=lambda: st.session_state.pop("task_export", None),
+                )
+
         # ✅ Go to Home Button (now properly inside right_col)
         if st.button("🏠 Go to Home"):
             st.session_state.selected_feature = "🏠 Home"
@@ -453,10 +442,12 @@ elif feature == "🧘 Wellness & Mood":
 
         if st.button("💡 Get Personalized Wellness Suggestion"):
             if mood_input.strip():
-                suggestion = get_contextual_wellness_response(mood_input, llm)
                 st.success("🌿 Here's something to support your wellness:")
                 st.markdown(f"📝 **You said:** _{mood_input}_")
-                st.markdown(f"🧘 **SmartLife Suggests:**\n> {suggestion.strip()}")
+                st.markdown("🧘 **SmartLife Suggests:**")
+                timings = {}
+                st.write_stream(stream_contextual_wellness_response(mood_input, llm, timings))
+                st.caption(format_timings(timings))
             else:
                 st.warning("⚠️ Please describe how you feel to receive a suggestion.")
 
@@ -485,7 +476,7 @@ elif feature == "🥗 Diet Tips":
 
 
     with col2:
-        diet_suggestion(llm)
+        diet_suggestion(llm, stream=True)
         if st.button("🏠 Go to Home"):
             st.session_state.selected_feature = "🏠 Home"
             st.rerun()
@@ -518,9 +509,17 @@ elif feature == "📈 Motivation":
 
         if st.button("▶️ Play Based on My Query"):
             if user_query.strip():
-                url = get_youtube_video_by_query(user_query)
+                url, source = search_youtube(user_query)
                 if url:
                     st.video(url)
+                    if source == "fallback":
+                        st.caption("ℹ️ Search is paused for today, so here's one of our favourite pep talks instead.")
+                    elif source == "error":
+                        st.caption("ℹ️ YouTube search didn't respond, so here's one of our favourite pep talks instead.")
+                elif source == "error":
+                    st.warning("YouTube search isn't responding right now. Please try again in a bit.")
+                elif source == "fallback":
+                    st.warning("Search is paused for today. Please try again tomorrow.")
                 else:
                     st.warning("Couldn't find a video for that query.")
             else:
@@ -675,22 +674,39 @@ elif feature == "📰 City News & Weather":
 
     with col2:
         st.header("📰 City News & Weather")
-        city = st.text_input("🏙️ Enter your city", "Coimbatore")
+        city = st.text_input("🏙️ Enter your city (separate several with commas)", "Coimbatore")
 
         if st.button("📡 Get Weather & News"):
-            weather_info, _ = get_weather(city)
-            news_info = get_top_news()
+            cities = list(dict.fromkeys(c.strip() for c in city.split(",") if c.strip())) or ["Coimbatore"]
+            if len(cities) > MAX_CITIES:
+                st.info(f"ℹ️ Showing the first {MAX_CITIES} cities; skipped: {', '.join(cities[MAX_CITIES:])}")
+                cities = cities[:MAX_CITIES]
+            # Weather for every city and the headlines are fetched in parallel
+            weather_by_city, news_info, sources = fetch_city_updates(
+                cities, get_weather, get_top_news,
+                weather_timeout=WEATHER_TIMEOUT, news_timeout=NEWS_TIMEOUT
+            )
+            slow = [name for name, result in sources.items() if not result.ok]
+            if slow:
+                st.caption(f"⚠️ Some sources didn't respond in time: {', '.join(slow)}")
+            cache = api_cache_stats()
+            st.caption("🗄️ API cache hit rate: " + ", ".join(
+                f"{source} {stats['hit_rate']:.0%}" for source, stats in cache.items()
+            ))
+            weather_info = "\n".join(weather_by_city.values())
 
             prompt = f"""
             You are a helpful assistant that provides weather and news updates.
-            1. Give a short weather update for the city.
+            1. Give a short weather update for each city.
             2. Summarize each news headline clearly and professionally.
             Weather:\n{weather_info}\nNews:\n{news_info}
             """
-            ai_response = conversation.predict(input=prompt)
-
             st.subheader("🌤️ Weather + News Summary")
-            st.write(ai_response)
+            timings = {}
+            st.write_stream(stream_conversation(llm, st.session_state.memory, prompt, timings))
+            st.caption(format_timings(timings))
+            memory = st.session_state.memory
+            st.caption(f"🧠 Conversation context: {memory.context_tokens}/{memory.token_budget} tokens")
 
         if st.button("🏠 Go to Home"):
             st.session_state.selected_feature = "🏠 Home"
@@ -1,23 +1,48 @@
 import streamlit as st
-import hashlib
-from db.mongo_connection import db
-
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+from db.auth_service import login
 
 def login_page():
-    st.sidebar.image("D:/SmartLife/assets/loginlogo.jpeg", use_column_width=True, caption="SmartLife")
-
-    st.subheader("🔐 Login to SmartLife")
-    username = st.text_input("Username")
-    password = st.text_input("Password", type="password")
-
-    if st.button("Login"):
-        users_col = db.users
-        user = users_col.find_one({"username": username})
-        if user and user["password"] == hash_password(password):
-            st.session_state.logged_in = True
-            st.session_state.username = username
-            st.success(f"Welcome back, {username}!")
-        else:
-            st.error("Invalid username or password.")
+    st.set_page_config(page_title="Login | SmartLife", layout="wide")
+
+    # Two-column layout: left for image, right for login
+    left_col, right_col = st.columns([0.5, 0.6])
+
+    with left_col:
+        st.image("assets/login_logo.jpeg", use_container_width=True)
+
+
+    with right_col:
+        st.markdown("<h1 style='text-align: center;'>🔐 Login</h1>", unsafe_allow_html=True)
+        st.markdown("""
+    <style>
+        .small-input input {
+            width: 200px !important;
+            height: 30px !important;
+            font-size: 14px !important;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+
+        username = st.text_input("Username")  # No key
+        password = st.text_input("Password", type="password")
+
+        if st.button("Login"):
+            with st.spinner("Checking your details..."):
+                token = login(username, password)
+            if token:
+                st.session_state.logged_in = True
+                st.session_state.username = username
+                st.session_state.auth_token = token
+                st.session_state.page = "home"
+                # The token stays in this tab's session state only, never in the URL
+                # (browser history, shared links and proxy logs would all see it)
+                st.rerun()
+            else:
+                st.error("Invalid username or password.")
+
+        st.markdown("---")
+        st.text("New user?")
+        if st.button("Go to Sign Up"):
+            st.session_state.page = "signup"
+            st.rerun()
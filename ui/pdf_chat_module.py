@@ -3,47 +3,48 @@
 import os
 import tempfile
 import streamlit as st
-from PyPDF2 import PdfReader
-from langchain_community.vectorstores import FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.memory import ConversationBufferMemory
 from langchain.chains import ConversationalRetrievalChain
-from langchain_groq import ChatGroq
+from tools.embedding_backends import embedding_model_name, load_embeddings
+from tools.embedding_cache import CachedEmbeddings
+from tools.fake_providers import fake_enabled
+from tools.llm_factory import get_routed_llm
+from tools.pdf_index import MergedRetriever, build_vectorstore, get_file_indexes
 
 # --- Caching heavy resources ---
 
 @st.cache_resource
 def get_embeddings_model():
-    return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    # Chunks embedded before (by any session or process) are read back from the cache.
+    # EMBEDDING_BACKEND=onnx-int8 swaps in the quantized ONNX model for CPU-only servers.
+    return CachedEmbeddings(load_embeddings(), embedding_model_name())
 
-@st.cache_data(show_spinner="Extracting PDF text...")
-def extract_text_from_pdfs(uploaded_files):
-    raw_text = ""
-    for file in uploaded_files:
-        try:
-            pdf_reader = PdfReader(file)
-            for page in pdf_reader.pages:
-                raw_text += page.extract_text() or ""
-        except Exception as e:
-            st.error(f"Error reading {file.name}: {e}")
-    return raw_text
 
+def _report_read_error(name, error):
+    st.error(f"Error reading {name}: {error}")
 
-def initialize_pdf_qa_chain(pdf_files):
-    text = extract_text_from_pdfs(pdf_files)
-    if not text.strip():
-        st.warning("No readable text found in the uploaded PDFs.")
-        return None
 
-    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=150)
-    docs = splitter.create_documents([text])
+def initialize_pdf_qa_chain(pdf_files):
     embeddings = get_embeddings_model()
 
     try:
-        # ✅ FAISS doesn't need external clients or directories
-        vectorstore = FAISS.from_documents(docs, embedding=embeddings)
-        retriever = vectorstore.as_retriever(search_type="similarity", k=4)
+        # One index per file, keyed by its bytes: only files never seen before are
+        # embedded, and a removed file simply drops out of the merged view.
+        with st.spinner("Preparing the document index..."):
+            indexes = get_file_indexes(
+                pdf_files, embeddings, lambda file: build_vectorstore([file], embeddings, _report_read_error)
+            )
+        if not indexes:
+            st.warning("No readable text found in the uploaded PDFs.")
+            return None
+
+        chain = st.session_state.get("pdf_chain")
+        if chain is not None:
+            # Same conversation, new set of files
+            chain.retriever.indexes = indexes
+            return chain
+
+        retriever = MergedRetriever(embeddings=embeddings, indexes=indexes, k=4)
 
         memory = ConversationBufferMemory(
             memory_key="chat_history",
@@ -52,15 +53,11 @@ def initialize_pdf_qa_chain(pdf_files):
         )
 
         groq_api_key = os.getenv("GROQ_API_KEY") or st.secrets.get("GROQ_API_KEY", "")
-        if not groq_api_key:
+        if not groq_api_key and not fake_enabled("llm"):
             st.error("GROQ API Key not found. Please set it in `.env` or `secrets.toml`.")
             return None
 
-        llm = ChatGroq(
-            api_key=groq_api_key,
-            model_name="llama3-8b-8192",
-            temperature=0.2
-        )
+        llm = get_routed_llm("pdf", api_key=groq_api_key, temperature=0.2)
 
         chain = ConversationalRetrievalChain.from_llm(
             llm=llm,
@@ -69,6 +66,8 @@ def initialize_pdf_qa_chain(pdf_files):
             return_source_documents=True
         )
 
+        # Kept for this session's follow-up questions
+        st.session_state.pdf_chain = chain
         return chain
 
     except Exception as e:
@@ -103,6 +102,9 @@ def render_pdf_chat():
                         for doc in result.get("source_documents", []):
                             content = getattr(doc, "page_content", "")
                             if content:
+                                meta = getattr(doc, "metadata", {})
+                                if "page" in meta:
+                                    st.caption(f"{meta.get('source', '')}, page {meta['page']}")
                                 st.markdown(content[:500] + "...")
                             else:
                                 st.write("⚠️ No text available in this source.")
@@ -1,28 +1,37 @@
 import streamlit as st
-import hashlib
-from db.mongo_connection import db
-
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+from db.auth_service import register
 
 def signup_page():
-    st.subheader("📝 Create a New Account")
+    st.set_page_config(page_title="Sign Up | SmartLife", layout="wide")
+
+    # Two-column layout: left for image, right for signup form
+    left_col, right_col = st.columns([0.6, 1])  # 0.5 width each
+
+    with left_col:
+        # Make image fill container
+        st.image("assets/signup.png", use_container_width=True)
+
+    with right_col:
+        st.markdown("<h1 style='text-align: center;'>📝 Sign Up</h1>", unsafe_allow_html=True)
 
-    username = st.text_input("Username")
-    password = st.text_input("Password", type="password")
-    confirm = st.text_input("Confirm Password", type="password")
+        username = st.text_input("Choose a Username")
+        password = st.text_input("Choose a Password", type="password")
+        confirm = st.text_input("Confirm Password", type="password")
 
-    if st.button("Sign Up"):
-        if password != confirm:
-            st.error("Passwords do not match.")
-            return
+        if st.button("Create Account"):
+            if not username.strip() or not password:
+                st.error("Please choose a username and password.")
+            elif password != confirm:
+                st.error("Passwords do not match.")
+            else:
+                with st.spinner("Creating your account..."):
+                    created = register(username.strip(), password)
+                if created:
+                    st.success("Account created successfully!")
+                    st.session_state.page = "login"
+                else:
+                    st.error("Username already exists.")
 
-        users_col = db.users
-        if users_col.find_one({"username": username}):
-            st.error("Username already exists.")
-        else:
-            users_col.insert_one({
-                "username": username,
-                "password": hash_password(password)
-            })
-            st.success("Account created! Go to Login.")
+        if st.button("Back to Login"):
+            st.session_state.page = "login"
+            st.rerun()